@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Query
+
+from app.core.response_cache import response_cache
+from app.core.result_cache import result_cache
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_cache_stats(limit: int = Query(default=20, ge=0, le=500)):
+    """Get cache statistics and the most recently used node responses."""
+    entries = await response_cache.backend.entries(limit) if response_cache.enabled else []
+    return {
+        "stats": await response_cache.stats(),
+        "entries": entries,
+        "pipeline_results": result_cache.stats(),
+    }
+
+
+@router.delete("/")
+async def purge_cache():
+    """Remove every cached node response and pipeline result."""
+    removed = await response_cache.purge()
+    removed_results = result_cache.invalidate()
+    return {
+        "removed": removed,
+        "removed_pipeline_results": removed_results,
+        "message": "Cache purged successfully",
+    }
@@ -1,16 +1,39 @@
-from fastapi import APIRouter, HTTPException
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional, AsyncIterator
+import asyncio
+import json
 
-from app.models.message import ChatRequest, ChatResponse, Message, MessageRole
+from app.models.message import (
+    ChatRequest,
+    ChatResponse,
+    BatchChatRequest,
+    Message,
+    MessageRole,
+)
+from app.models.pipeline import PipelineState
+from app.models.job import JobInfo, JobStatus
+from app.models.history import ExecutionRecord, HistoryPage
 from app.core.pipeline import PipelineExecutor
 from app.core.pipeline_store import pipeline_store
+from app.core.executions import execution_registry
+from app.core.history import execution_history
+from app.core.memory import conversation_memory
+from app.core.result_cache import result_cache
+from app.core.jobs import job_manager, JobQueueFull
+from app.config import settings
 
 router = APIRouter()
 
 
 @router.post("/", response_model=ChatResponse)
-async def send_message(request: ChatRequest):
-    """Send a message through the consensus pipeline."""
+async def send_message(request: ChatRequest, http_request: Request):
+    """Send a message through the consensus pipeline.
+
+    With `stream=true` the final node's tokens are returned as server-sent
+    events instead of waiting for the whole pipeline to finish. If the
+    client disconnects, the execution is cancelled.
+    """
     # Get pipeline config
     pipeline_id = request.pipeline_id or "default"
     pipeline_config = pipeline_store.get(pipeline_id)
@@ -18,35 +41,273 @@ async def send_message(request: ChatRequest):
     if not pipeline_config:
         raise HTTPException(status_code=404, detail=f"Pipeline '{pipeline_id}' not found")
 
+    # Serve near-identical repeat questions from the result cache
+    cached = await _cached_result(request, pipeline_id)
+
     # Create pipeline executor
-    executor = PipelineExecutor(pipeline_config)
+    executor = PipelineExecutor(
+        pipeline_config,
+        stream=request.stream,
+        deadline=request.deadline,
+        conversation_id=request.conversation_id,
+    )
+
+    if request.stream:
+        return StreamingResponse(
+            _stream_events(executor, request.message, cached),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-    # Execute pipeline
+    if cached is not None:
+        return _build_chat_response(cached)
+
+    # Execute pipeline, stopping it if the client goes away
+    watcher = asyncio.create_task(_cancel_on_disconnect(http_request, executor))
     try:
         result = await executor.execute(request.message)
-
-        return ChatResponse(
-            message=Message(
-                role=MessageRole.ASSISTANT,
-                content=result.final_output or "",
-            ),
-            pipeline_execution_id=result.execution_id,
-            consensus_score=result.consensus_score,
-            node_responses=[
-                {
-                    "node_id": node_id,
-                    "status": state.status.value,
-                    "output": state.output,
-                }
-                for node_id, state in result.node_states.items()
-            ],
-        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        watcher.cancel()
+
+    if settings.result_cache_enabled:
+        result_cache.store(pipeline_id, request.message, result)
+    return _build_chat_response(result)
+
+
+@router.post("/batch")
+async def send_batch(request: BatchChatRequest):
+    """Run many messages through one pipeline, streaming results as NDJSON.
+
+    Each line is a JSON object with the message `index`, the execution
+    `status` and the chat `response`, emitted in completion order.
+    """
+    pipeline_id = request.pipeline_id or "default"
+    pipeline_config = pipeline_store.get(pipeline_id)
+
+    if not pipeline_config:
+        raise HTTPException(status_code=404, detail=f"Pipeline '{pipeline_id}' not found")
+
+    if len(request.messages) > settings.batch_max_messages:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.batch_max_messages} messages",
+        )
+
+    concurrency = min(
+        request.concurrency or settings.batch_default_concurrency,
+        settings.batch_max_concurrency,
+    )
+    provider_concurrency = {
+        **settings.batch_provider_concurrency,
+        **(request.provider_concurrency or {}),
+    }
+
+    async def results() -> AsyncIterator[str]:
+        async for index, state in PipelineExecutor.execute_batch(
+            pipeline_config,
+            request.messages,
+            concurrency=concurrency,
+            provider_concurrency=provider_concurrency,
+            publish_events=request.publish_events,
+            deadline=request.deadline,
+        ):
+            line = {
+                "index": index,
+                "status": state.status,
+                "response": _build_chat_response(state).model_dump(mode="json"),
+            }
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(request: ChatRequest):
+    """Queue a message for background execution and return its execution id.
+
+    Progress is published on the pipeline WebSocket; poll
+    `GET /api/chat/jobs/{execution_id}` for the status and result.
+    """
+    pipeline_id = request.pipeline_id or "default"
+    pipeline_config = pipeline_store.get(pipeline_id)
+
+    if not pipeline_config:
+        raise HTTPException(status_code=404, detail=f"Pipeline '{pipeline_id}' not found")
+
+    cached = await _cached_result(request, pipeline_id)
+    if cached is not None:
+        job = job_manager.add_completed(cached)
+        return {"execution_id": job.execution_id, "status": job.status}
+
+    def store_result(result: PipelineState):
+        if settings.result_cache_enabled:
+            result_cache.store(pipeline_id, request.message, result)
 
+    executor = PipelineExecutor(
+        pipeline_config,
+        deadline=request.deadline,
+        conversation_id=request.conversation_id,
+    )
+    try:
+        job = job_manager.submit(executor, request.message, on_complete=store_result)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    return {"execution_id": job.execution_id, "status": job.status}
+
+
+@router.get("/jobs/{execution_id}", response_model=JobInfo)
+async def get_job(execution_id: str):
+    """Get the status of a background execution, with its result once done."""
+    job = job_manager.get(execution_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return JobInfo(
+        execution_id=job.execution_id,
+        pipeline_id=job.state.pipeline_id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        error=job.error,
+        result=_build_chat_response(job.state) if job.status == JobStatus.COMPLETED else None,
+    )
+
+
+@router.post("/executions/{execution_id}/cancel")
+async def cancel_execution(execution_id: str):
+    """Cancel a running or queued execution and its outstanding provider calls."""
+    if not execution_registry.cancel(execution_id):
+        raise HTTPException(status_code=404, detail="Execution not found or already finished")
+
+    return {"execution_id": execution_id, "status": "cancelling"}
+
+
+@router.get("/history", response_model=HistoryPage)
+async def get_chat_history(
+    conversation_id: Optional[str] = None,
+    pipeline_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    include_nodes: bool = False,
+):
+    """List past executions, newest first.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the next page.
+    """
+    try:
+        return await execution_history.query(
+            conversation_id=conversation_id,
+            pipeline_id=pipeline_id,
+            cursor=cursor,
+            limit=limit,
+            include_nodes=include_nodes,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/history/{execution_id}", response_model=ExecutionRecord)
+async def get_execution(execution_id: str):
+    """Get one past execution with all of its node states."""
+    record = await execution_history.get(execution_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    return record
+
+
+async def _cached_result(request: ChatRequest, pipeline_id: str) -> Optional[PipelineState]:
+    """Look up a cached result for the request and record it as an execution.
+
+    Follow-up messages in a conversation depend on earlier turns, so only a
+    conversation's first message may be served from the cache.
+    """
+    if not settings.result_cache_enabled:
+        return None
+    conversation_id = request.conversation_id
+    if conversation_id and await conversation_memory.has_history(conversation_id):
+        return None
+    cached = result_cache.lookup(pipeline_id, request.message)
+    if cached is not None:
+        cached.conversation_id = conversation_id
+        execution_history.record(cached, request.message)
+        if conversation_id and cached.final_output:
+            conversation_memory.add_turn(conversation_id, request.message, cached.final_output)
+    return cached
+
+
+def _build_chat_response(result: PipelineState) -> ChatResponse:
+    """Convert a finished pipeline state into the chat API response."""
+    return ChatResponse(
+        message=Message(
+            role=MessageRole.ASSISTANT,
+            content=result.final_output or "",
+        ),
+        pipeline_execution_id=result.execution_id,
+        consensus_score=result.consensus_score,
+        common_themes=result.common_themes,
+        deadline_exceeded=result.deadline_exceeded,
+        usage={
+            "prompt_tokens": result.prompt_tokens,
+            "completion_tokens": result.completion_tokens,
+            "cost": result.cost,
+            "latency": (
+                (result.completed_at - result.started_at).total_seconds()
+                if result.started_at and result.completed_at
+                else None
+            ),
+        },
+        node_responses=[
+            {
+                "node_id": node_id,
+                "status": state.status.value,
+                "output": state.output,
+                "tokens_used": state.tokens_used,
+                "ttft": state.ttft,
+                "latency": state.latency,
+                "cost": state.cost,
+                "cached": state.cached,
+            }
+            for node_id, state in result.node_states.items()
+        ],
+    )
+
+
+async def _cancel_on_disconnect(request: Request, executor: PipelineExecutor):
+    """Cancel an execution once its HTTP client has disconnected."""
+    while not await request.is_disconnected():
+        await asyncio.sleep(settings.disconnect_poll_interval)
+    executor.cancel()
+
+
+def _sse(event: str, data: str) -> str:
+    """Format a single server-sent event."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _stream_events(
+    executor: PipelineExecutor, message: str, cached: Optional[PipelineState] = None
+) -> AsyncIterator[str]:
+    """Yield SSE frames: start, one delta per final-node chunk, then done."""
+    if cached is not None:
+        yield _sse("start", json.dumps({"execution_id": cached.execution_id}))
+        yield _sse("delta", json.dumps({"delta": cached.final_output}))
+        yield _sse("done", _build_chat_response(cached).model_dump_json())
+        return
+
+    yield _sse("start", json.dumps({"execution_id": executor.state.execution_id}))
+
+    try:
+        async for delta in executor.execute_stream(message):
+            yield _sse("delta", json.dumps({"delta": delta}))
+    except Exception as e:
+        yield _sse("error", json.dumps({"detail": str(e)}))
+        return
 
-@router.get("/history")
-async def get_chat_history(conversation_id: Optional[str] = None):
-    """Get chat history for a conversation."""
-    # TODO: Implement persistent storage
-    return {"messages": [], "conversation_id": conversation_id}
+    if settings.result_cache_enabled:
+        result_cache.store(executor.config.id, message, executor.state)
+    yield _sse("done", _build_chat_response(executor.state).model_dump_json())
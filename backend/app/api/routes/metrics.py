@@ -0,0 +1,78 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import metrics
+from app.core.executions import execution_registry
+from app.core.events import event_bus
+from app.core.jobs import job_manager
+from app.core.history import execution_history
+from app.api.websocket import manager
+from app.providers.circuit_breaker import circuit_breakers
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Gauges are read from the live components when scraped
+metrics.gauge(
+    "decisionllm_executions_in_flight",
+    "Executions queued or running.",
+    lambda: len(execution_registry),
+)
+metrics.gauge(
+    "decisionllm_jobs_queued",
+    "Background jobs waiting for a worker.",
+    lambda: job_manager.stats()["queued"],
+)
+metrics.gauge(
+    "decisionllm_websocket_clients",
+    "Connected WebSocket clients.",
+    lambda: manager.stats()["clients"],
+)
+metrics.gauge(
+    "decisionllm_websocket_queued_messages",
+    "Messages waiting in WebSocket client send queues.",
+    lambda: manager.stats()["queued_messages"],
+)
+metrics.gauge(
+    "decisionllm_websocket_dropped_messages_total",
+    "Messages dropped from full WebSocket client queues.",
+    lambda: manager.stats()["dropped_messages"],
+    kind="counter",
+)
+metrics.gauge(
+    "decisionllm_event_bus_queue_depth",
+    "Events waiting to be broadcast.",
+    lambda: event_bus.stats()["queue_depth"],
+)
+metrics.gauge(
+    "decisionllm_event_bus_events_total",
+    "Events handled by the broadcast bus, by outcome.",
+    lambda: {
+        (outcome,): count for outcome, count in event_bus.stats().items()
+        if outcome in ("published", "delivered", "coalesced", "dropped")
+    },
+    ("outcome",),
+    kind="counter",
+)
+metrics.gauge(
+    "decisionllm_history_queue_depth",
+    "Execution records waiting to be written to the history store.",
+    lambda: execution_history.stats()["queued"],
+)
+metrics.gauge(
+    "decisionllm_circuit_open",
+    "Whether a provider's circuit breaker is open (1) or not (0).",
+    lambda: {
+        (provider,): int(breaker["state"] == "open")
+        for provider, breaker in circuit_breakers.stats().items()
+    },
+    ("provider",),
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
@@ -4,6 +4,7 @@ from typing import Optional
 from app.models.pipeline import PipelineConfig, PipelineLayer
 from app.models.node import NodeConfig, NodeRole
 from app.core.pipeline_store import pipeline_store
+from app.core.result_cache import result_cache
 
 router = APIRouter()
 
@@ -39,6 +40,7 @@ async def update_pipeline(pipeline_id: str, config: PipelineConfig):
 
     config.id = pipeline_id
     pipeline_store.save(config)
+    result_cache.invalidate(pipeline_id)
     return {"id": pipeline_id, "message": "Pipeline updated successfully"}
 
 
@@ -50,6 +52,7 @@ async def delete_pipeline(pipeline_id: str):
 
     if not pipeline_store.delete(pipeline_id):
         raise HTTPException(status_code=404, detail="Pipeline not found")
+    result_cache.invalidate(pipeline_id)
 
     return {"message": "Pipeline deleted successfully"}
 
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from app.providers import provider_registry
+from app.providers.rate_limit import rate_limiter
+from app.providers.circuit_breaker import CircuitState, circuit_breakers
 from app.config import settings
 
 router = APIRouter()
@@ -27,15 +29,30 @@ async def list_providers():
             elif provider_name == "local":
                 configured = True  # Local doesn't need API key
 
+            # Providers never called have no breaker and are closed
+            breaker = circuit_breakers.find(provider_name)
             providers.append({
                 "name": provider_name,
                 "configured": configured,
+                "circuit": (breaker.state if breaker else CircuitState.CLOSED).value,
                 "models": provider_class.get_available_models(),
             })
 
     return {"providers": providers}
 
 
+@router.get("/rate-limits")
+async def get_rate_limits():
+    """Get per-provider rate limit budgets and queueing statistics."""
+    return {"limits": rate_limiter.stats()}
+
+
+@router.get("/circuit-breakers")
+async def get_circuit_breakers():
+    """Get the circuit breaker state of each provider that has been called."""
+    return {"circuit_breakers": circuit_breakers.stats()}
+
+
 @router.get("/{provider_name}/models")
 async def get_provider_models(provider_name: str):
     """Get available models for a specific provider."""
@@ -1,47 +1,184 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Set
+from collections import deque
+from typing import Deque, Dict, Optional, Set
 import json
 import asyncio
 
+from app.config import settings
+from app.core.events import TERMINAL_STATUSES, coalesce_key, merge_events, event_bus
+from app.core.executions import execution_registry
+
 router = APIRouter()
 
+class ClientConnection:
+    """A connected client with its own bounded send queue and sender task.
+
+    Slow consumers never block the publisher: when the queue is full the
+    oldest event is dropped, and consecutive deltas or progress updates for
+    the same target are coalesced into one message.
+    """
+
+    def __init__(self, websocket: WebSocket, max_queue: int):
+        self.websocket = websocket
+        self.subscriptions: Set[str] = set()
+        # Exclusive clients receive only their subscriptions' events
+        self.exclusive = False
+        self.max_queue = max_queue
+        self.dropped = 0
+        self._queue: Deque[dict] = deque()
+        self._ready = asyncio.Event()
+        self._sender: Optional[asyncio.Task] = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def start(self, on_error):
+        self._sender = asyncio.create_task(self._send_loop(on_error))
+
+    def stop(self):
+        if self._sender is not None:
+            self._sender.cancel()
+
+    def enqueue(self, message: dict):
+        if self._queue and self._coalesce(self._queue[-1], message):
+            return
+
+        if len(self._queue) >= self.max_queue:
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(message)
+        self._ready.set()
+
+    def _coalesce(self, last: dict, message: dict) -> bool:
+        key = coalesce_key(message)
+        if key is None or coalesce_key(last) != key:
+            return False
+        # Events are shared across clients, so merge into a new dict
+        self._queue[-1] = merge_events(last, message)
+        return True
+
+    async def _send_loop(self, on_error):
+        try:
+            while True:
+                await self._ready.wait()
+                while self._queue:
+                    message = self._queue.popleft()
+                    await asyncio.wait_for(
+                        self.websocket.send_json(message),
+                        timeout=settings.ws_send_timeout,
+                    )
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            on_error(self.websocket)
+
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        # Clients that have not opted out receive every event
+        self._unfiltered: Set[ClientConnection] = set()
+        self._subscribers: Dict[str, Set[ClientConnection]] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.add(websocket)
+        client = ClientConnection(websocket, settings.ws_client_queue_size)
+        client.start(self.disconnect)
+        self.active_connections[websocket] = client
+        self._unfiltered.add(client)
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.discard(websocket)
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        client.stop()
+        self._unfiltered.discard(client)
+        for execution_id in client.subscriptions:
+            self._remove_subscriber(execution_id, client)
+
+    def subscribe(self, websocket: WebSocket, execution_id: str, exclusive: bool = False) -> bool:
+        """Route events for an active execution to this client.
+
+        Clients keep receiving every event unless they subscribe with
+        `exclusive`, which limits them to their subscriptions until they
+        unsubscribe from the last one. Subscriptions end with the execution;
+        returns False for executions that are not queued or running.
+        """
+        client = self.active_connections.get(websocket)
+        if client is None or execution_registry.get(execution_id) is None:
+            return False
+        client.subscriptions.add(execution_id)
+        self._subscribers.setdefault(execution_id, set()).add(client)
+        if exclusive:
+            client.exclusive = True
+            self._unfiltered.discard(client)
+        return True
+
+    def unsubscribe(self, websocket: WebSocket, execution_id: str):
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return
+        client.subscriptions.discard(execution_id)
+        self._remove_subscriber(execution_id, client)
+        if not client.subscriptions:
+            client.exclusive = False
+            self._unfiltered.add(client)
+
+    def _remove_subscriber(self, execution_id: str, client: ClientConnection):
+        subscribers = self._subscribers.get(execution_id)
+        if subscribers is not None:
+            subscribers.discard(client)
+            if not subscribers:
+                del self._subscribers[execution_id]
 
     async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients."""
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                disconnected.add(connection)
+        """Queue a message for every client interested in its execution.
 
-        # Clean up disconnected clients
-        for conn in disconnected:
-            self.active_connections.discard(conn)
+        Only enqueues; per-client sender tasks do the actual sends.
+        """
+        targets = set(self._unfiltered)
+        execution_id = message.get("execution_id")
+        if execution_id is not None:
+            targets |= self._subscribers.get(execution_id, set())
+        else:
+            targets = set(self.active_connections.values())
+
+        for client in targets:
+            client.enqueue(message)
+
+        if message.get("event") == "pipeline_update" and message.get("status") in TERMINAL_STATUSES:
+            # The execution is over; drop its subscriptions
+            for client in self._subscribers.pop(execution_id, ()):
+                client.subscriptions.discard(execution_id)
 
     async def send_to_client(self, websocket: WebSocket, message: dict):
         """Send message to a specific client."""
-        try:
-            await websocket.send_json(message)
-        except Exception:
-            self.disconnect(websocket)
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.enqueue(message)
+
+    def stats(self) -> dict:
+        clients = list(self.active_connections.values())
+        return {
+            "clients": len(clients),
+            "subscribed_executions": len(self._subscribers),
+            "queued_messages": sum(client.queued for client in clients),
+            "dropped_messages": sum(client.dropped for client in clients),
+        }
 
 
 # Global connection manager
 manager = ConnectionManager()
 
 
+@router.get("/stats")
+async def websocket_stats():
+    """Event bus and WebSocket fan-out metrics."""
+    return {"event_bus": event_bus.stats(), "connections": manager.stats()}
+
+
 @router.websocket("/pipeline")
 async def pipeline_websocket(websocket: WebSocket):
     """WebSocket endpoint for pipeline execution updates."""
@@ -54,16 +191,53 @@ async def pipeline_websocket(websocket: WebSocket):
 
             try:
                 message = json.loads(data)
+                if not isinstance(message, dict):
+                    await manager.send_to_client(websocket, {
+                        "type": "error",
+                        "message": "Expected a JSON object",
+                    })
+                    continue
 
                 if message.get("type") == "ping":
                     await manager.send_to_client(websocket, {"type": "pong"})
                 elif message.get("type") == "subscribe":
                     # Client wants to subscribe to specific execution updates
                     execution_id = message.get("execution_id")
+                    if isinstance(execution_id, str) and manager.subscribe(
+                        websocket, execution_id, exclusive=bool(message.get("exclusive"))
+                    ):
+                        await manager.send_to_client(websocket, {
+                            "type": "subscribed",
+                            "execution_id": execution_id,
+                        })
+                    else:
+                        await manager.send_to_client(websocket, {
+                            "type": "error",
+                            "message": "Execution not found",
+                            "execution_id": execution_id,
+                        })
+                elif message.get("type") == "unsubscribe":
+                    execution_id = message.get("execution_id")
+                    if execution_id:
+                        manager.unsubscribe(websocket, execution_id)
                     await manager.send_to_client(websocket, {
-                        "type": "subscribed",
+                        "type": "unsubscribed",
                         "execution_id": execution_id,
                     })
+                elif message.get("type") == "cancel":
+                    # Client abandoned an execution; stop its provider calls
+                    execution_id = message.get("execution_id")
+                    if execution_id and execution_registry.cancel(execution_id):
+                        await manager.send_to_client(websocket, {
+                            "type": "cancelled",
+                            "execution_id": execution_id,
+                        })
+                    else:
+                        await manager.send_to_client(websocket, {
+                            "type": "error",
+                            "message": "Execution not found",
+                            "execution_id": execution_id,
+                        })
 
             except json.JSONDecodeError:
                 await manager.send_to_client(websocket, {
@@ -72,14 +246,7 @@ async def pipeline_websocket(websocket: WebSocket):
                 })
 
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Any other error ends the connection too; stop its sender either way
         manager.disconnect(websocket)
-
-
-async def broadcast_node_update(event: dict):
-    """Broadcast a node update event to all connected clients."""
-    await manager.broadcast(event)
-
-
-async def broadcast_pipeline_update(event: dict):
-    """Broadcast a pipeline update event to all connected clients."""
-    await manager.broadcast(event)
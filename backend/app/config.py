@@ -11,6 +11,115 @@ class Settings(BaseSettings):
 
     # Local/Ollama
     ollama_base_url: str = "http://localhost:11434"
+    ollama_timeout: float = 120.0
+
+    # Record provider calls to a file, or serve them back offline
+    provider_mode: str = "live"  # live, record, replay
+    recording_path: str = "recordings.jsonl"  # Gzip-compressed if it ends in .gz
+    recording_include_messages: bool = False  # Store prompts, not just their hash
+    replay_speed: float = 1.0  # 2.0 replays twice as fast; 0 skips the delays
+    replay_match: str = "exact"  # exact, model (any call of the same model)
+
+    # Simulated provider used by the benchmarks, per model, e.g.
+    # {"sim-fast": {"ttft": 0.2, "tokens_per_second": 120, "error_rate": 0.01}}
+    simulated_profiles: dict[str, dict[str, float]] = {}
+
+    # Provider connection pools
+    provider_max_connections: int = 100
+    provider_max_keepalive_connections: int = 20
+    provider_keepalive_expiry: float = 30.0
+    provider_http2: bool = True
+    # Per-provider overrides, e.g. {"openai": {"max_connections": 200}}
+    provider_pool_limits: dict[str, dict[str, float]] = {}
+
+    # Rate limits keyed by provider or "provider:model", e.g.
+    # {"openai": {"requests_per_minute": 500, "tokens_per_minute": 150000,
+    #             "max_concurrency": 32}}
+    provider_rate_limits: dict[str, dict[str, float]] = {}
+
+    # Model prices in USD per million tokens, overriding the built-in table,
+    # e.g. {"gpt-4o": {"input": 2.5, "output": 10.0}}
+    model_prices: dict[str, dict[str, float]] = {}
+
+    # Retries and circuit breaking
+    provider_max_retries: int = 2
+    retry_base_delay: float = 0.5
+    retry_max_delay: float = 8.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+
+    # Timeouts (seconds); a request deadline also bounds every node call
+    node_timeout: Optional[float] = None  # Default for nodes without `timeout`
+    max_request_deadline: Optional[float] = None  # Cap on client-supplied deadlines
+    disconnect_poll_interval: float = 1.0  # How often /api/chat checks for gone clients
+
+    # Hedged requests
+    hedge_percentile: float = 95.0
+    hedge_min_samples: int = 20
+    hedge_default_delay: float = 10.0  # Used until enough latency samples exist
+
+    # Node response cache
+    response_cache_backend: str = "memory"  # memory, sqlite, none
+    response_cache_max_entries: int = 10000
+    response_cache_ttl: float = 3600.0
+    response_cache_path: str = "response_cache.db"
+
+    # Near-duplicate pipeline result cache; off by default since a cached
+    # answer to a slightly different question can be the wrong answer
+    result_cache_enabled: bool = False
+    result_cache_threshold: float = 0.9  # Jaccard similarity of word bigrams
+    result_cache_max_entries: int = 50000
+    result_cache_ttl: float = 3600.0
+
+    # Consensus worker pool
+    consensus_workers: int = 2  # 0 always runs consensus inline
+    consensus_pool_mode: str = "thread"  # thread, process
+    consensus_inline_threshold: int = 20000  # Total characters of output
+
+    # Event bus between executor and WebSocket delivery
+    event_bus_max_queue: int = 10000
+
+    # WebSocket fan-out
+    ws_client_queue_size: int = 256  # Oldest events are dropped beyond this
+    ws_send_timeout: float = 5.0
+
+    # Background job execution
+    job_concurrency: int = 4  # Concurrent executions per worker process
+    job_queue_size: int = 100
+    job_retention: int = 1000  # Finished jobs kept for status lookups
+
+    # Batch execution
+    batch_max_messages: int = 10000
+    batch_default_concurrency: int = 8
+    batch_max_concurrency: int = 64
+    batch_provider_concurrency: dict[str, int] = {}  # Defaults for every batch
+
+    # Execution history
+    history_backend: str = "sqlite"  # sqlite, none
+    history_path: str = "history.db"
+    history_batch_size: int = 200
+    history_flush_interval: float = 1.0  # Max seconds a record waits before writing
+    history_queue_size: int = 10000
+
+    # Conversation memory
+    memory_context_tokens: int = 3000  # Budget for prior turns sent to generators
+    memory_max_turns: int = 50  # Turns kept per conversation
+    memory_max_conversations: int = 10000  # Conversations kept in memory
+    # Older turns are summarized by this model; unset means they are dropped
+    memory_summary_provider: Optional[str] = None
+    memory_summary_model: Optional[str] = None
+    memory_summary_max_tokens: int = 400
+
+    # Tracing
+    tracing_exporter: str = "none"  # none, jsonl, otlp
+    tracing_sample_rate: float = 1.0  # Fraction of executions traced
+    tracing_path: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_otlp_headers: dict[str, str] = {}
+    tracing_service_name: str = "decisionllm"
+    tracing_batch_size: int = 512
+    tracing_flush_interval: float = 2.0  # Max seconds a span waits before export
+    tracing_queue_size: int = 10000
 
     # App Settings
     debug: bool = True
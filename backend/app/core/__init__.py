@@ -1,5 +1,5 @@
 from app.core.pipeline import PipelineExecutor
-from app.core.consensus import ConsensusCalculator
+from app.core.consensus import ConsensusCalculator, IncrementalConsensus
 from app.core.pipeline_store import pipeline_store
 
-__all__ = ["PipelineExecutor", "ConsensusCalculator", "pipeline_store"]
+__all__ = ["PipelineExecutor", "ConsensusCalculator", "IncrementalConsensus", "pipeline_store"]
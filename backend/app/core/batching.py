@@ -0,0 +1,96 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BatchWriter:
+    """Hands queued items to `write` in batches from a background task.
+
+    `add()` only appends to an in-memory queue, so callers on the request
+    path never wait on storage. The writer sends batches of up to
+    `batch_size` as soon as one is full, and whatever is queued at least
+    every `flush_interval` seconds. When the queue is full the oldest item
+    is dropped.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[Any]], Awaitable[None]],
+        name: str,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+    ):
+        self.write = write
+        self.name = name  # What the items are, for log messages
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: Deque[Any] = deque()
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def add(self, item: Any) -> None:
+        """Queue an item for the next batch."""
+        if len(self._queue) >= self.max_queue:
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(item)
+        if len(self._queue) >= self.batch_size:
+            self._batch_ready.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._write_loop())
+
+    async def stop(self) -> None:
+        """Stop the background task, then write what is still queued."""
+        if self._task is not None:
+            self._stopping = True
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _write_loop(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write every queued item now."""
+        while self._queue:
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self.batch_size, len(self._queue)))
+            ]
+            try:
+                await self.write(batch)
+                self.written += len(batch)
+            except Exception:
+                logger.exception("Failed to write %d %s", len(batch), self.name)
+                self.failed += len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
@@ -1,7 +1,23 @@
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import FrozenSet, List, Tuple
 import re
 from collections import Counter
 
+import numpy as np
+from scipy import sparse
+
+from app.utils.similarity import jaccard_token_sets
+
+
+@dataclass
+class ConsensusMatrix:
+    """Similarity of every response pair, computed in one batched pass."""
+    jaccard: np.ndarray  # n x n token-set Jaccard similarity
+    cosine: np.ndarray  # n x n term-frequency cosine similarity
+    mean_consensus: float  # Mean pairwise Jaccard similarity
+    centrality: np.ndarray  # Mean Jaccard similarity of each response to the others
+    most_central_index: int
+
 
 class ConsensusCalculator:
     """Calculate consensus between multiple LLM responses."""
@@ -28,19 +44,67 @@ class ConsensusCalculator:
         words = re.findall(r'\b\w+\b', text)
         return words
 
+    @classmethod
+    def compute_similarity_matrix(cls, responses: List[str]) -> ConsensusMatrix:
+        """Tokenize each response once and score all pairs with sparse products."""
+        n = len(responses)
+        vocabulary: dict = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        counts: List[int] = []
+        for i, response in enumerate(responses):
+            for word, count in Counter(cls._tokenize(response)).items():
+                rows.append(i)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+                counts.append(count)
+
+        term_counts = sparse.csr_matrix(
+            (np.array(counts, dtype=np.float64), (rows, cols)),
+            shape=(n, len(vocabulary)),
+        )
+        term_presence = term_counts.copy()
+        term_presence.data[:] = 1.0
+
+        # Jaccard: |A & B| / (|A| + |B| - |A & B|), zero if either side is empty
+        intersection = (term_presence @ term_presence.T).toarray()
+        set_sizes = np.diag(intersection)
+        union = set_sizes[:, None] + set_sizes[None, :] - intersection
+        non_empty = (set_sizes[:, None] > 0) & (set_sizes[None, :] > 0)
+        jaccard = np.divide(
+            intersection, union, out=np.zeros((n, n)), where=non_empty & (union > 0)
+        )
+
+        # Cosine over raw term frequencies
+        dot = (term_counts @ term_counts.T).toarray()
+        norms = np.sqrt(np.diag(dot))
+        magnitude = np.outer(norms, norms)
+        cosine = np.divide(dot, magnitude, out=np.zeros((n, n)), where=magnitude > 0)
+
+        if n < 2:
+            return ConsensusMatrix(
+                jaccard=jaccard,
+                cosine=cosine,
+                mean_consensus=1.0,
+                centrality=np.ones(n),
+                most_central_index=0 if n else -1,
+            )
+
+        off_diagonal_totals = jaccard.sum(axis=1) - np.diag(jaccard)
+        return ConsensusMatrix(
+            jaccard=jaccard,
+            cosine=cosine,
+            mean_consensus=float(jaccard[np.triu_indices(n, k=1)].mean()),
+            centrality=off_diagonal_totals / (n - 1),
+            most_central_index=int(np.argmax(off_diagonal_totals)),
+        )
+
     @classmethod
     def calculate_pairwise_consensus(cls, responses: List[str]) -> float:
         """Calculate average pairwise similarity across all responses."""
         if len(responses) < 2:
             return 1.0
 
-        similarities = []
-        for i in range(len(responses)):
-            for j in range(i + 1, len(responses)):
-                sim = cls.calculate_similarity(responses[i], responses[j])
-                similarities.append(sim)
-
-        return sum(similarities) / len(similarities) if similarities else 0.0
+        return cls.compute_similarity_matrix(responses).mean_consensus
 
     @classmethod
     def find_most_central_response(cls, responses: List[str]) -> Tuple[int, str]:
@@ -51,19 +115,14 @@ class ConsensusCalculator:
         if len(responses) == 1:
             return 0, responses[0]
 
-        # Calculate total similarity for each response
-        total_similarities = []
-        for i, response in enumerate(responses):
-            total_sim = sum(
-                cls.calculate_similarity(response, other)
-                for j, other in enumerate(responses)
-                if i != j
-            )
-            total_similarities.append(total_sim)
-
-        best_idx = max(range(len(responses)), key=lambda i: total_similarities[i])
+        best_idx = cls.compute_similarity_matrix(responses).most_central_index
         return best_idx, responses[best_idx]
 
+    @classmethod
+    def summarize(cls, responses: List[str]) -> Tuple[float, List[str]]:
+        """Compute pairwise consensus and common themes in one call."""
+        return cls.calculate_pairwise_consensus(responses), cls.extract_common_themes(responses)
+
     @classmethod
     def extract_common_themes(cls, responses: List[str], min_freq: int = 2) -> List[str]:
         """Extract common themes/words across responses."""
@@ -96,3 +155,49 @@ class ConsensusCalculator:
         ]
 
         return common_themes[:10]
+
+
+class IncrementalConsensus:
+    """Pairwise consensus maintained as responses arrive one at a time.
+
+    Each `add` tokenizes only the new response and scores it against the
+    stored token sets, i.e. appends one row to the similarity matrix, so a
+    layer of n nodes costs O(n) comparisons per update instead of O(n^2).
+    """
+
+    def __init__(self):
+        self._token_sets: List[FrozenSet[str]] = []
+        self._totals: List[float] = []  # Similarity of each response to all others
+        self._pair_sum = 0.0
+        self._pair_count = 0
+
+    def add(self, response: str) -> float:
+        """Add a response and return the updated consensus score."""
+        tokens = frozenset(ConsensusCalculator._tokenize(response))
+        row = [jaccard_token_sets(tokens, other) for other in self._token_sets]
+
+        for i, similarity in enumerate(row):
+            self._totals[i] += similarity
+        self._token_sets.append(tokens)
+        self._totals.append(sum(row))
+        self._pair_sum += sum(row)
+        self._pair_count += len(row)
+
+        return self.score
+
+    @property
+    def score(self) -> float:
+        """Mean pairwise Jaccard similarity; 1.0 with fewer than two responses."""
+        if self._pair_count == 0:
+            return 1.0
+        return self._pair_sum / self._pair_count
+
+    @property
+    def most_central_index(self) -> int:
+        """Index (in insertion order) of the response most similar to the rest."""
+        if not self._totals:
+            return -1
+        return max(range(len(self._totals)), key=lambda i: self._totals[i])
+
+    def __len__(self) -> int:
+        return len(self._token_sets)
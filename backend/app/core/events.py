@@ -0,0 +1,176 @@
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from app.core.tracing import tracer, current_span, UNSAMPLED
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pipeline statuses after which an execution publishes nothing more
+TERMINAL_STATUSES = ("completed", "partial", "cancelled", "error")
+
+
+def coalesce_key(event: dict) -> Optional[Tuple]:
+    """Key under which a queued event may be replaced by a newer one.
+
+    Output deltas merge per node and progress updates collapse to the latest
+    per execution; every other event, including the terminal update, is
+    delivered as-is.
+    """
+    kind = event.get("event")
+    if kind == "node_delta":
+        return (kind, event.get("execution_id"), event.get("node_id"))
+    if kind == "pipeline_update" and event.get("status") not in TERMINAL_STATUSES:
+        return (kind, event.get("execution_id"))
+    return None
+
+
+def merge_events(queued: dict, event: dict) -> dict:
+    """Merge a newer event into a queued one with the same coalesce key."""
+    if event.get("event") == "node_delta":
+        return {**event, "delta": queued["delta"] + event["delta"]}
+    return event
+
+
+class EventBus:
+    """Non-blocking event queue between pipeline execution and delivery.
+
+    The executor publishes without awaiting; a background dispatcher hands
+    events to the delivery callback (the WebSocket fan-out). An event is
+    merged into the still-queued one with the same coalesce key, so a burst
+    of deltas from nodes streaming side by side collapses to one message per
+    node. Queuing any other event for that node or execution closes its
+    pending slots, so nothing is ever delivered ahead of an event published
+    before it for the same target. When the queue is full the oldest event
+    is dropped.
+    """
+
+    def __init__(self, max_queue: int = 10000):
+        self.max_queue = max_queue
+        # Each slot is [event, publishing span, published at] so coalescing
+        # can replace the event in place
+        self._queue: Deque[list] = deque()
+        # Coalesce key -> its slot while that slot can still take merges
+        self._pending: Dict[Tuple, list] = {}
+        self._ready = asyncio.Event()
+        self._deliver: Optional[Callable[[dict], Awaitable[None]]] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self.published = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    def publish(self, event: dict) -> None:
+        """Queue an event for delivery without blocking the caller."""
+        self.published += 1
+        if not self.running:
+            # No dispatcher (e.g. executor used outside the app)
+            self.dropped += 1
+            return
+
+        key = coalesce_key(event)
+        if key is not None and key in self._pending:
+            slot = self._pending[key]
+            slot[0] = merge_events(slot[0], event)
+            self.coalesced += 1
+            return
+        if key is None:
+            self._close_pending(event)
+
+        if len(self._queue) >= self.max_queue:
+            self._forget(self._queue.popleft())
+            self.dropped += 1
+
+        slot = [event, current_span() or UNSAMPLED, time.monotonic()]
+        self._queue.append(slot)
+        if key is not None:
+            self._pending[key] = slot
+        self.max_depth = max(self.max_depth, len(self._queue))
+        self._ready.set()
+
+    def _close_pending(self, event: dict) -> None:
+        """Stop merging into slots queued before `event` for its target.
+
+        A node event closes that node's delta slot and an execution event
+        closes every slot of the execution; either also closes the
+        execution's progress slot, so a later update can't jump ahead.
+        """
+        execution_id = event.get("execution_id")
+        node_id = event.get("node_id")
+        if node_id is not None:
+            self._pending.pop(("node_delta", execution_id, node_id), None)
+            self._pending.pop(("pipeline_update", execution_id), None)
+            return
+        for key in [k for k in self._pending if k[1] == execution_id]:
+            del self._pending[key]
+
+    def _forget(self, slot: list) -> None:
+        """Drop the index entry of a slot leaving the queue."""
+        key = coalesce_key(slot[0])
+        if key is not None and self._pending.get(key) is slot:
+            del self._pending[key]
+
+    def start(self, deliver: Callable[[dict], Awaitable[None]]) -> None:
+        """Start the background dispatcher delivering events to `deliver`."""
+        self._deliver = deliver
+        if not self.running:
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        """Deliver what is queued, then stop the dispatcher."""
+        if self._dispatcher is None:
+            return
+        await self._drain()
+        self._dispatcher.cancel()
+        try:
+            await self._dispatcher
+        except asyncio.CancelledError:
+            pass
+        self._dispatcher = None
+
+    async def _drain(self) -> None:
+        while self._queue:
+            slot = self._queue.popleft()
+            self._forget(slot)
+            event, parent, published_at = slot
+            try:
+                # Traced under the span that published the event
+                with tracer.span(
+                    "broadcast",
+                    parent=parent,
+                    event=event.get("event"),
+                    queue_wait=time.monotonic() - published_at,
+                ):
+                    await self._deliver(event)
+                self.delivered += 1
+            except Exception:
+                logger.exception("Event delivery failed")
+
+    async def _dispatch(self) -> None:
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            await self._drain()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queue_depth": len(self._queue),
+            "max_queue_depth": self.max_depth,
+            "published": self.published,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
+
+# Global bus used by all executions
+event_bus = EventBus(max_queue=settings.event_bus_max_queue)
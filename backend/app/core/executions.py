@@ -0,0 +1,42 @@
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from app.core.pipeline import PipelineExecutor
+
+
+class ExecutionRegistry:
+    """Tracks executions that are queued or running, by execution id.
+
+    Lets API handlers and WebSocket clients cancel an execution they did not
+    start themselves. Executors register when they start (or are queued) and
+    unregister when they finish.
+    """
+
+    def __init__(self):
+        self._executors: Dict[str, "PipelineExecutor"] = {}
+
+    def register(self, executor: "PipelineExecutor") -> None:
+        self._executors[executor.state.execution_id] = executor
+
+    def unregister(self, executor: "PipelineExecutor") -> None:
+        execution_id = executor.state.execution_id
+        if self._executors.get(execution_id) is executor:
+            del self._executors[execution_id]
+
+    def get(self, execution_id: str) -> Optional["PipelineExecutor"]:
+        return self._executors.get(execution_id)
+
+    def cancel(self, execution_id: str) -> bool:
+        """Cancel an active execution; returns False if none is known."""
+        executor = self._executors.get(execution_id)
+        if executor is None:
+            return False
+        executor.cancel()
+        return True
+
+    def __len__(self) -> int:
+        return len(self._executors)
+
+
+# Global registry of active executions
+execution_registry = ExecutionRegistry()
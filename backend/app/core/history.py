@@ -0,0 +1,374 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+
+from app.core.batching import BatchWriter
+from app.models.history import ExecutionRecord, HistoryPage
+from app.models.node import NodeState
+from app.models.pipeline import PipelineState
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (recorded_at, user_message, state) queued for the next batch
+PendingRecord = Tuple[float, str, PipelineState]
+
+
+class HistoryBackend(ABC):
+    """Abstract storage backend for finished executions."""
+
+    def open(self) -> None:
+        """Connect to the store; called when the history starts."""
+        pass
+
+    @abstractmethod
+    async def write(self, records: List[PendingRecord]) -> None:
+        """Persist a batch of executions with their node states."""
+        pass
+
+    @abstractmethod
+    async def query(
+        self,
+        conversation_id: Optional[str] = None,
+        pipeline_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        include_nodes: bool = False,
+    ) -> HistoryPage:
+        """Return executions newest first, continuing after `cursor`."""
+        pass
+
+    @abstractmethod
+    async def get(self, execution_id: str) -> Optional[ExecutionRecord]:
+        """Return one execution with its node states."""
+        pass
+
+    @abstractmethod
+    async def conversation_turns(self, conversation_id: str, limit: int) -> List[Tuple[str, str]]:
+        """Return up to `limit` latest (user message, answer) pairs, oldest first."""
+        pass
+
+    def close(self) -> None:
+        """Release resources held by the backend."""
+        pass
+
+
+def encode_cursor(recorded_at: float, execution_id: str) -> str:
+    return f"{recorded_at!r}:{execution_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    recorded_at, _, execution_id = cursor.partition(":")
+    try:
+        return float(recorded_at), execution_id
+    except ValueError:
+        raise ValueError(f"Invalid history cursor '{cursor}'")
+
+
+class SQLiteHistoryBackend(HistoryBackend):
+    """SQLite execution history in WAL mode.
+
+    Pages are fetched by keyset on (recorded_at, execution_id) using an
+    index per filter, so page cost does not grow with table size or page
+    depth. Writes and reads use separate connections so readers are
+    never queued behind a batch insert.
+    """
+
+    _COLUMNS = (
+        "execution_id, pipeline_id, conversation_id, status, user_message, "
+        "final_output, consensus_score, started_at, completed_at, recorded_at"
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+
+    def open(self) -> None:
+        self._writer = self._connect(self.path)
+        self._writer.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS executions (
+                execution_id TEXT PRIMARY KEY,
+                pipeline_id TEXT NOT NULL,
+                conversation_id TEXT,
+                status TEXT NOT NULL,
+                user_message TEXT NOT NULL,
+                final_output TEXT,
+                consensus_score REAL,
+                started_at TEXT,
+                completed_at TEXT,
+                recorded_at REAL NOT NULL,
+                state TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS node_states (
+                execution_id TEXT NOT NULL,
+                node_id TEXT NOT NULL,
+                status TEXT NOT NULL,
+                state TEXT NOT NULL,
+                PRIMARY KEY (execution_id, node_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_executions_time
+                ON executions (recorded_at, execution_id);
+            CREATE INDEX IF NOT EXISTS idx_executions_conversation
+                ON executions (conversation_id, recorded_at, execution_id);
+            CREATE INDEX IF NOT EXISTS idx_executions_pipeline
+                ON executions (pipeline_id, recorded_at, execution_id);
+            """
+        )
+        self._writer.commit()
+        self._reader = self._connect(self.path)
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _write(self, records: List[PendingRecord]) -> None:
+        execution_rows = []
+        node_rows = []
+        for recorded_at, user_message, state in records:
+            execution_rows.append((
+                state.execution_id,
+                state.pipeline_id,
+                state.conversation_id,
+                state.status,
+                user_message,
+                state.final_output,
+                state.consensus_score,
+                state.started_at.isoformat() if state.started_at else None,
+                state.completed_at.isoformat() if state.completed_at else None,
+                recorded_at,
+                state.model_dump_json(exclude={"node_states"}),
+            ))
+            node_rows.extend(
+                (state.execution_id, node_id, node_state.status.value, node_state.model_dump_json())
+                for node_id, node_state in state.node_states.items()
+            )
+
+        with self._write_lock:
+            with self._writer:
+                self._writer.executemany(
+                    f"INSERT OR REPLACE INTO executions ({self._COLUMNS}, state) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    execution_rows,
+                )
+                self._writer.executemany(
+                    "INSERT OR REPLACE INTO node_states (execution_id, node_id, status, state) "
+                    "VALUES (?, ?, ?, ?)",
+                    node_rows,
+                )
+
+    def _query(
+        self,
+        conversation_id: Optional[str],
+        pipeline_id: Optional[str],
+        cursor: Optional[str],
+        limit: int,
+        include_nodes: bool,
+    ) -> HistoryPage:
+        clauses = []
+        params: list = []
+        if conversation_id is not None:
+            clauses.append("conversation_id = ?")
+            params.append(conversation_id)
+        if pipeline_id is not None:
+            clauses.append("pipeline_id = ?")
+            params.append(pipeline_id)
+        if cursor is not None:
+            clauses.append("(recorded_at, execution_id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._read_lock:
+            rows = self._reader.execute(
+                f"SELECT {self._COLUMNS} FROM executions {where} "
+                "ORDER BY recorded_at DESC, execution_id DESC LIMIT ?",
+                (*params, limit + 1),
+            ).fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            nodes = self._node_states([row[0] for row in rows]) if include_nodes else {}
+
+        items = [self._record(row, nodes.get(row[0]) if include_nodes else None) for row in rows]
+        next_cursor = encode_cursor(rows[-1][9], rows[-1][0]) if has_more else None
+        return HistoryPage(items=items, next_cursor=next_cursor)
+
+    def _node_states(self, execution_ids: List[str]) -> Dict[str, List[NodeState]]:
+        nodes: Dict[str, List[NodeState]] = {execution_id: [] for execution_id in execution_ids}
+        if not execution_ids:
+            return nodes
+        placeholders = ", ".join("?" for _ in execution_ids)
+        for execution_id, state in self._reader.execute(
+            f"SELECT execution_id, state FROM node_states WHERE execution_id IN ({placeholders})",
+            execution_ids,
+        ):
+            nodes[execution_id].append(NodeState.model_validate_json(state))
+        return nodes
+
+    def _get(self, execution_id: str) -> Optional[ExecutionRecord]:
+        with self._read_lock:
+            row = self._reader.execute(
+                f"SELECT {self._COLUMNS} FROM executions WHERE execution_id = ?",
+                (execution_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            nodes = self._node_states([execution_id])
+        return self._record(row, nodes[execution_id])
+
+    def _conversation_turns(self, conversation_id: str, limit: int) -> List[Tuple[str, str]]:
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT user_message, final_output FROM executions "
+                "WHERE conversation_id = ? AND final_output IS NOT NULL "
+                "AND status IN ('completed', 'partial') "
+                "ORDER BY recorded_at DESC, execution_id DESC LIMIT ?",
+                (conversation_id, limit),
+            ).fetchall()
+        return [(row[0], row[1]) for row in reversed(rows)]
+
+    @staticmethod
+    def _record(row: tuple, node_states: Optional[List[NodeState]]) -> ExecutionRecord:
+        return ExecutionRecord(
+            execution_id=row[0],
+            pipeline_id=row[1],
+            conversation_id=row[2],
+            status=row[3],
+            user_message=row[4],
+            final_output=row[5],
+            consensus_score=row[6],
+            started_at=row[7],
+            completed_at=row[8],
+            recorded_at=datetime.utcfromtimestamp(row[9]),
+            node_states=node_states,
+        )
+
+    async def write(self, records: List[PendingRecord]) -> None:
+        await asyncio.to_thread(self._write, records)
+
+    async def query(
+        self,
+        conversation_id: Optional[str] = None,
+        pipeline_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        include_nodes: bool = False,
+    ) -> HistoryPage:
+        return await asyncio.to_thread(
+            self._query, conversation_id, pipeline_id, cursor, limit, include_nodes
+        )
+
+    async def get(self, execution_id: str) -> Optional[ExecutionRecord]:
+        return await asyncio.to_thread(self._get, execution_id)
+
+    async def conversation_turns(self, conversation_id: str, limit: int) -> List[Tuple[str, str]]:
+        return await asyncio.to_thread(self._conversation_turns, conversation_id, limit)
+
+    def close(self) -> None:
+        for conn in (self._writer, self._reader):
+            if conn is not None:
+                conn.close()
+        self._writer = self._reader = None
+
+
+class ExecutionHistory:
+    """Records finished executions without blocking the request path.
+
+    `record()` only queues the state; a `BatchWriter` persists queued
+    records in the background. The backend is opened by `start()`, so
+    nothing touches the store until the app starts; until then reads
+    return nothing.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[HistoryBackend],
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_queue: int = 10000,
+    ):
+        self.backend = backend
+        self._batches = BatchWriter(
+            lambda records: self.backend.write(records),
+            "history records",
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue=max_queue,
+        )
+        self._open = False
+        self.recorded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def record(self, state: PipelineState, user_message: str) -> None:
+        """Queue a finished execution for persistence."""
+        if not self.enabled:
+            return
+        self.recorded += 1
+        self._batches.add((time.time(), user_message, state))
+
+    def start(self) -> None:
+        """Open the backend and start the background writer."""
+        if self.enabled and not self._open:
+            self.backend.open()
+            self._open = True
+            self._batches.start()
+
+    async def stop(self) -> None:
+        """Write what is queued, then stop the writer and close the backend."""
+        if self._open:
+            await self._batches.stop()
+            self.backend.close()
+            self._open = False
+
+    async def flush(self) -> None:
+        """Write every queued record now."""
+        if self._open:
+            await self._batches.flush()
+
+    async def query(self, **filters) -> HistoryPage:
+        if not self._open:
+            return HistoryPage(items=[])
+        return await self.backend.query(**filters)
+
+    async def get(self, execution_id: str) -> Optional[ExecutionRecord]:
+        if not self._open:
+            return None
+        return await self.backend.get(execution_id)
+
+    async def conversation_turns(self, conversation_id: str, limit: int) -> List[Tuple[str, str]]:
+        if not self._open:
+            return []
+        return await self.backend.conversation_turns(conversation_id, limit)
+
+    def stats(self) -> Dict[str, int]:
+        return {"recorded": self.recorded, **self._batches.stats()}
+
+
+def create_execution_history() -> ExecutionHistory:
+    """Build the execution history configured in settings."""
+    backend: Optional[HistoryBackend] = None
+    if settings.history_backend == "sqlite":
+        backend = SQLiteHistoryBackend(settings.history_path)
+    return ExecutionHistory(
+        backend,
+        batch_size=settings.history_batch_size,
+        flush_interval=settings.history_flush_interval,
+        max_queue=settings.history_queue_size,
+    )
+
+
+# Global history shared by all executions
+execution_history = create_execution_history()
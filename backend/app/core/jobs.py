@@ -0,0 +1,158 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional
+import asyncio
+import logging
+
+from app.core.pipeline import PipelineExecutor
+from app.core.executions import execution_registry
+from app.models.job import JobStatus
+from app.models.pipeline import PipelineState
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+_FINISHED = (JobStatus.COMPLETED, JobStatus.CANCELLED, JobStatus.ERROR)
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+    pass
+
+
+@dataclass
+class Job:
+    state: PipelineState
+    executor: Optional[PipelineExecutor] = None
+    message: str = ""
+    on_complete: Optional[Callable[[PipelineState], None]] = None
+    status: JobStatus = JobStatus.QUEUED
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    @property
+    def execution_id(self) -> str:
+        return self.state.execution_id
+
+
+class JobManager:
+    """Runs pipeline executions in the background with bounded concurrency.
+
+    Submitted jobs wait in a bounded queue and are picked up by a fixed set
+    of workers; finished jobs are kept for lookup up to `retention` entries.
+    """
+
+    def __init__(self, concurrency: int = 4, max_queue: int = 100, retention: int = 1000):
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.retention = retention
+        self._queue: Optional[asyncio.Queue] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(
+        self,
+        executor: PipelineExecutor,
+        message: str,
+        on_complete: Optional[Callable[[PipelineState], None]] = None,
+    ) -> Job:
+        """Queue an execution and return its job without waiting for it."""
+        if self._queue is None:
+            raise RuntimeError("Job manager is not running")
+
+        job = Job(
+            state=executor.state,
+            executor=executor,
+            message=message,
+            on_complete=on_complete,
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"Job queue is full ({self.max_queue} pending)")
+
+        self._jobs[job.execution_id] = job
+        # Queued jobs can be cancelled before a worker picks them up
+        execution_registry.register(executor)
+        self._trim()
+        return job
+
+    def add_completed(self, state: PipelineState) -> Job:
+        """Record a result that was available without running (e.g. cached)."""
+        job = Job(state=state, status=JobStatus.COMPLETED)
+        job.started_at = job.completed_at = job.created_at
+        self._jobs[job.execution_id] = job
+        self._trim()
+        return job
+
+    def get(self, execution_id: str) -> Optional[Job]:
+        return self._jobs.get(execution_id)
+
+    def _trim(self) -> None:
+        """Forget the oldest finished jobs beyond the retention limit."""
+        excess = len(self._jobs) - self.retention
+        if excess <= 0:
+            return
+        for execution_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[execution_id].status in _FINISHED:
+                del self._jobs[execution_id]
+                excess -= 1
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.utcnow()
+            try:
+                result = await job.executor.execute(job.message)
+                if result.status == "cancelled":
+                    job.status = JobStatus.CANCELLED
+                else:
+                    job.status = JobStatus.COMPLETED
+                    if job.on_complete:
+                        job.on_complete(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Job %s failed", job.execution_id)
+                job.status = JobStatus.ERROR
+                job.error = str(e)
+            finally:
+                job.completed_at = datetime.utcnow()
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        running = sum(1 for job in self._jobs.values() if job.status == JobStatus.RUNNING)
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": running,
+            "tracked": len(self._jobs),
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+        }
+
+
+# Global job manager
+job_manager = JobManager(
+    concurrency=settings.job_concurrency,
+    max_queue=settings.job_queue_size,
+    retention=settings.job_retention,
+)
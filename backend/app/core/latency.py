@@ -0,0 +1,29 @@
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """Rolling window of observed call latencies per provider/model."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Return the q-th percentile (0-100), or None without enough samples."""
+        samples = self._samples.get(key)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+# Global tracker shared by all executions
+latency_tracker = LatencyTracker()
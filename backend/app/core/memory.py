@@ -0,0 +1,190 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+from app.providers import provider_registry
+from app.providers.rate_limit import rate_limiter
+from app.core.history import execution_history
+from app.utils.tokens import estimate_tokens, truncate_to_tokens
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an "
+    "assistant. Update the summary with the new turns. Keep facts, decisions, "
+    "names and open questions the assistant may need later; be concise."
+)
+
+
+@dataclass
+class _Conversation:
+    # (user message, answer) pairs, oldest first; turns[0] is turn number `start`
+    turns: List[Tuple[str, str]] = field(default_factory=list)
+    start: int = 0
+    summary: Optional[str] = None
+    summarized_upto: int = 0  # Turn numbers below this are in `summary`
+    summarizing: bool = False
+
+
+class ConversationMemory:
+    """Prior turns of each conversation, fitted to a token budget.
+
+    The newest turns that fit the budget are sent verbatim; older turns are
+    folded into a rolling summary that is cached per conversation and
+    refreshed in the background, so building a context never waits on a
+    model call. Without a summary model, older turns are simply dropped.
+    Conversations are loaded from the execution history on first use.
+    """
+
+    def __init__(
+        self,
+        context_tokens: int = 3000,
+        max_turns: int = 50,
+        max_conversations: int = 10000,
+        summary_provider: Optional[str] = None,
+        summary_model: Optional[str] = None,
+        summary_max_tokens: int = 400,
+    ):
+        self.context_tokens = context_tokens
+        self.max_turns = max_turns
+        self.max_conversations = max_conversations
+        self.summary_provider = summary_provider
+        self.summary_model = summary_model
+        self.summary_max_tokens = summary_max_tokens
+        self._conversations: "OrderedDict[str, _Conversation]" = OrderedDict()
+        self._summary_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def summarizes(self) -> bool:
+        return bool(self.summary_provider and self.summary_model)
+
+    async def _load(self, conversation_id: str) -> _Conversation:
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            turns = await execution_history.conversation_turns(conversation_id, self.max_turns)
+            # Another request may have loaded it while we waited
+            conversation = self._conversations.setdefault(
+                conversation_id, _Conversation(turns=turns)
+            )
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+        self._conversations.move_to_end(conversation_id)
+        return conversation
+
+    async def has_history(self, conversation_id: str) -> bool:
+        return bool((await self._load(conversation_id)).turns)
+
+    def add_turn(self, conversation_id: str, user_message: str, answer: str) -> None:
+        """Append a finished turn to a loaded conversation."""
+        conversation = self._conversations.get(conversation_id)
+        if conversation is None:
+            # Not loaded (or evicted); the history store has the turn
+            return
+        conversation.turns.append((user_message, answer))
+        excess = len(conversation.turns) - self.max_turns
+        if excess > 0:
+            del conversation.turns[:excess]
+            conversation.start += excess
+
+    async def build_context(self, conversation_id: str) -> List[Dict[str, str]]:
+        """Messages describing the conversation so far, within the token budget."""
+        conversation = await self._load(conversation_id)
+        if not conversation.turns:
+            return []
+
+        budget = self.context_tokens
+        if self.summarizes:
+            budget -= self.summary_max_tokens
+
+        # Newest turns first, as many as fit; always keep part of the last one
+        recent: List[Tuple[str, str]] = []
+        used = 0
+        for user_message, answer in reversed(conversation.turns):
+            cost = estimate_tokens(user_message) + estimate_tokens(answer)
+            if used + cost > budget:
+                if not recent and budget > 0:
+                    half = budget // 2
+                    recent.append((
+                        truncate_to_tokens(user_message, half),
+                        truncate_to_tokens(answer, budget - half),
+                    ))
+                break
+            recent.append((user_message, answer))
+            used += cost
+        recent.reverse()
+
+        messages: List[Dict[str, str]] = []
+        first_recent = conversation.start + len(conversation.turns) - len(recent)
+        if first_recent > conversation.start and self.summarizes:
+            if conversation.summarized_upto < first_recent:
+                self._refresh_summary(conversation, first_recent)
+            if conversation.summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation:\n{conversation.summary}",
+                })
+
+        for user_message, answer in recent:
+            messages.append({"role": "user", "content": user_message})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def _refresh_summary(self, conversation: _Conversation, upto: int) -> None:
+        """Fold turns older than `upto` into the summary in the background."""
+        if conversation.summarizing:
+            return
+        conversation.summarizing = True
+        task = asyncio.create_task(self._summarize(conversation, upto))
+        self._summary_tasks.add(task)
+        task.add_done_callback(self._summary_tasks.discard)
+
+    async def _summarize(self, conversation: _Conversation, upto: int) -> None:
+        try:
+            first = max(conversation.summarized_upto, conversation.start)
+            new_turns = conversation.turns[first - conversation.start:upto - conversation.start]
+            transcript = "\n\n".join(
+                f"User: {user_message}\nAssistant: {answer}"
+                for user_message, answer in new_turns
+            )
+            if conversation.summary:
+                transcript = f"Current summary:\n{conversation.summary}\n\nNew turns:\n{transcript}"
+
+            provider = provider_registry.get_instance(self.summary_provider)
+            if provider is None:
+                raise ValueError(f"Provider '{self.summary_provider}' not found")
+            messages = [
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": transcript},
+            ]
+            async with rate_limiter.limit(
+                self.summary_provider,
+                self.summary_model,
+                rate_limiter.estimate_tokens(messages, self.summary_max_tokens),
+            ) as reservation:
+                result = await provider.generate(
+                    model=self.summary_model,
+                    messages=messages,
+                    temperature=0,
+                    max_tokens=self.summary_max_tokens,
+                )
+                reservation.settle(result.prompt_tokens + result.completion_tokens)
+            conversation.summary = result.text
+            conversation.summarized_upto = upto
+        except Exception:
+            logger.exception("Conversation summary failed")
+        finally:
+            conversation.summarizing = False
+
+
+# Global memory shared by all chat requests
+conversation_memory = ConversationMemory(
+    context_tokens=settings.memory_context_tokens,
+    max_turns=settings.memory_max_turns,
+    max_conversations=settings.memory_max_conversations,
+    summary_provider=settings.memory_summary_provider,
+    summary_model=settings.memory_summary_model,
+    summary_max_tokens=settings.memory_summary_max_tokens,
+)
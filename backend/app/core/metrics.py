@@ -0,0 +1,239 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+# Seconds; covers fast cache hits up to multi-minute pipeline runs
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+LabelValues = Tuple[str, ...]
+GaugeValue = Union[float, Dict[LabelValues, float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    """A named metric rendered with its HELP and TYPE lines."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """The metric's sample lines in the Prometheus text format."""
+        pass
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution per label set; observing is a bisect and two adds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(
+                    (*self.labelnames, "le"), (*labels, _format_value(bound))
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time, so it costs nothing until scraped.
+
+    The callback returns a number, or a dict of label values to numbers.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], GaugeValue],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.read = read
+        # Totals kept elsewhere (e.g. dropped events) are exposed as counters
+        self.kind = kind
+
+    def _samples(self) -> List[str]:
+        value = self.read()
+        if not isinstance(value, dict):
+            value = {(): value}
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(sample)}"
+            for labels, sample in value.items()
+        ]
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        read: Callable[[], GaugeValue],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, read, labelnames, kind))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry and the metrics recorded on the execution path
+metrics = MetricsRegistry()
+
+pipeline_duration = metrics.histogram(
+    "decisionllm_pipeline_duration_seconds",
+    "Wall time of pipeline executions.",
+    ("pipeline_id", "status"),
+)
+layer_duration = metrics.histogram(
+    "decisionllm_layer_duration_seconds",
+    "Time from the first node start to the last node finish in a layer.",
+    ("pipeline_id", "level"),
+)
+node_duration = metrics.histogram(
+    "decisionllm_node_duration_seconds",
+    "Wall time of node executions, including retries and failover.",
+    ("provider", "model", "role", "status"),
+)
+provider_call_duration = metrics.histogram(
+    "decisionllm_provider_call_duration_seconds",
+    "Latency of successful provider calls.",
+    ("provider", "model"),
+)
+provider_ttft = metrics.histogram(
+    "decisionllm_provider_ttft_seconds",
+    "Time to first token of successful provider calls.",
+    ("provider", "model"),
+)
+provider_errors = metrics.counter(
+    "decisionllm_provider_errors_total",
+    "Failed provider call attempts.",
+    ("provider", "model"),
+)
+provider_retries = metrics.counter(
+    "decisionllm_provider_retries_total",
+    "Provider calls retried after a transient error.",
+    ("provider", "model"),
+)
+provider_tokens = metrics.counter(
+    "decisionllm_provider_tokens_total",
+    "Tokens used by provider calls.",
+    ("provider", "model", "kind"),
+)
+provider_cost = metrics.counter(
+    "decisionllm_provider_cost_usd_total",
+    "Estimated spend on provider calls in USD.",
+    ("provider", "model"),
+)
+consensus_duration = metrics.histogram(
+    "decisionllm_consensus_duration_seconds",
+    "Time spent computing consensus.",
+    ("operation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
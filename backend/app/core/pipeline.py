@@ -1,21 +1,75 @@
 import asyncio
+import contextlib
+import time
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Callable, AsyncIterator, Tuple, Type
 
-from app.models.pipeline import PipelineConfig, PipelineState
-from app.models.node import NodeConfig, NodeState, NodeStatus, NodeRole, NodeUpdateEvent
+from app.models.pipeline import PipelineConfig, PipelineLayer, PipelineState, StragglerPolicy
+from app.models.node import (
+    NodeConfig,
+    NodeState,
+    NodeStatus,
+    NodeRole,
+    NodeUpdateEvent,
+    NodeDeltaEvent,
+)
+from app.providers.base import BaseProvider, GenerationResult
 from app.providers import provider_registry
-from app.core.consensus import ConsensusCalculator
-from app.api.websocket import broadcast_node_update, broadcast_pipeline_update
+from app.providers.rate_limit import rate_limiter
+from app.providers.circuit_breaker import circuit_breakers
+from app.core.consensus import ConsensusCalculator, IncrementalConsensus
+from app.core.latency import latency_tracker
+from app.core.retry import RetryPolicy, is_retryable
+from app.core.response_cache import response_cache
+from app.core.workers import consensus_pool
+from app.core.events import event_bus
+from app.core.executions import execution_registry
+from app.core.history import execution_history
+from app.core.memory import conversation_memory
+from app.core import metrics
+from app.core.tracing import tracer, UNSAMPLED
+from app.config import settings
+
+# Straggler finishers of executions that already returned, kept so they
+# are not garbage collected mid-run
+_detached_tasks: set = set()
 
 
 class PipelineExecutor:
     """Executes a pipeline configuration with multiple LLM nodes."""
 
-    def __init__(self, config: PipelineConfig):
+    def __init__(
+        self,
+        config: PipelineConfig,
+        stream: bool = False,
+        publish_events: bool = True,
+        system_messages: Optional[Dict[str, List[Dict[str, str]]]] = None,
+        provider_semaphores: Optional[Dict[str, asyncio.Semaphore]] = None,
+        deadline: Optional[float] = None,
+        conversation_id: Optional[str] = None,
+    ):
         self.config = config
+        # Seconds the whole execution may take; the clock starts in execute()
+        if settings.max_request_deadline is not None:
+            deadline = min(deadline or settings.max_request_deadline, settings.max_request_deadline)
+        self.deadline = deadline
+        self._deadline_at: Optional[float] = None
+        self.publish_events = publish_events
+        # Batches share prompt prefixes and provider slots across executors
+        self._system_messages = system_messages or self.build_system_messages(config)
+        self._provider_semaphores = provider_semaphores or {}
+        # In streaming mode every node uses stream_generate and pushes
+        # node_delta events; the first final-layer node also feeds the caller,
+        # and the other final nodes' deltas are held in case it stops.
+        self.stream = stream
+        self._delta_sink: Optional[Callable[[str], None]] = None
+        final_nodes = config.layers[-1].nodes if config.layers else []
+        self._stream_node_id = final_nodes[0].id if final_nodes else None
+        self._streamed_nodes: set = set()
+        self._held_deltas: Dict[str, List[str]] = {}
         self.state = PipelineState(
             pipeline_id=config.id,
+            conversation_id=conversation_id,
             node_states={
                 node.id: NodeState(node_id=node.id)
                 for layer in config.layers
@@ -23,126 +77,929 @@ class PipelineExecutor:
             },
         )
         self.consensus_calculator = ConsensusCalculator()
+        self._node_levels = {
+            node.id: layer.level for layer in config.layers for node in layer.nodes
+        }
+        self._layer_consensus = {
+            layer.level: IncrementalConsensus() for layer in config.layers
+        }
+        self._node_tasks: Dict[str, asyncio.Task] = {}
+        self._background_tasks: set = set()
+        self._cancel_requested = asyncio.Event()
+        self._cancel_reason: Optional[str] = None
+        # Reasons for nodes cancelled on their own, e.g. stragglers after a quorum
+        self._node_cancel_reasons: Dict[str, str] = {}
+        # Prior conversation turns, sent to generator nodes
+        self._context_messages: List[Dict[str, str]] = []
+        # Trace spans of the execution and of each layer that started
+        self._span = UNSAMPLED
+        self._layer_spans: Dict[int, object] = {}
+
+    @staticmethod
+    def build_system_messages(config: PipelineConfig) -> Dict[str, List[Dict[str, str]]]:
+        """Build each node's system prompt messages once per configuration."""
+        system_messages: Dict[str, List[Dict[str, str]]] = {}
+        for layer in config.layers:
+            for node in layer.nodes:
+                messages = []
+                if node.system_prompt:
+                    messages.append({"role": "system", "content": node.system_prompt})
+                elif node.role == NodeRole.GENERATOR:
+                    messages.append({
+                        "role": "system",
+                        "content": "You are a helpful assistant. Provide a clear and comprehensive answer.",
+                    })
+                system_messages[node.id] = messages
+        return system_messages
+
+    @classmethod
+    async def execute_batch(
+        cls,
+        config: PipelineConfig,
+        messages: List[str],
+        concurrency: int = 8,
+        provider_concurrency: Optional[Dict[str, int]] = None,
+        publish_events: bool = False,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[Tuple[int, PipelineState]]:
+        """Run many messages through one pipeline, yielding results as they finish.
+
+        At most `concurrency` executions run at once, and calls to each
+        provider in `provider_concurrency` are capped across the whole batch.
+        Yields `(index, state)` pairs in completion order; failed executions
+        are yielded with their error state rather than raised. `deadline`
+        applies to each message from the moment its execution starts.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        system_messages = cls.build_system_messages(config)
+        provider_semaphores = {
+            name: asyncio.Semaphore(limit)
+            for name, limit in (provider_concurrency or {}).items()
+        }
+
+        async def run(index: int, message: str) -> Tuple[int, PipelineState]:
+            async with semaphore:
+                executor = cls(
+                    config,
+                    publish_events=publish_events,
+                    system_messages=system_messages,
+                    provider_semaphores=provider_semaphores,
+                    deadline=deadline,
+                )
+                try:
+                    await executor.execute(message)
+                except Exception:
+                    # Error already recorded in the execution state
+                    pass
+                return index, executor.state
+
+        tasks = [
+            asyncio.create_task(run(index, message))
+            for index, message in enumerate(messages)
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
 
     async def execute(self, user_message: str) -> PipelineState:
-        """Execute the entire pipeline with the given user message."""
+        """Execute the entire pipeline with the given user message.
+
+        If the deadline passes first, unfinished nodes are cancelled and the
+        state is returned with status "partial" and `deadline_exceeded` set.
+        After `cancel()` the state is returned with status "cancelled".
+        """
+        with tracer.span(
+            "pipeline.execute",
+            pipeline_id=self.state.pipeline_id,
+            execution_id=self.state.execution_id,
+            conversation_id=self.state.conversation_id,
+            nodes=len(self.state.node_states),
+            stream=self.stream,
+        ) as span:
+            self._span = span
+            try:
+                return await self._execute(user_message)
+            finally:
+                for layer_span in self._layer_spans.values():
+                    layer_span.end()
+                span.set_attributes(
+                    status=self.state.status,
+                    deadline_exceeded=self.state.deadline_exceeded,
+                    early_exit=self.state.early_exit,
+                    prompt_tokens=self.state.prompt_tokens,
+                    completion_tokens=self.state.completion_tokens,
+                    cost=self.state.cost,
+                )
+
+    async def _execute(self, user_message: str) -> PipelineState:
         self.state.status = "running"
         self.state.started_at = datetime.utcnow()
+        if self.deadline is not None:
+            self._deadline_at = time.monotonic() + self.deadline
+        execution_registry.register(self)
 
-        await self._broadcast_pipeline_status()
+        self._broadcast_pipeline_status()
 
         try:
-            # Process each layer sequentially
-            previous_outputs: List[str] = []
+            if self.state.conversation_id:
+                self._context_messages = await conversation_memory.build_context(
+                    self.state.conversation_id
+                )
 
-            for layer in self.config.layers:
-                self.state.current_layer = layer.level
-                await self._broadcast_pipeline_status()
+            # Schedule every node at once; each waits only on its own inputs
+            dependencies = self._resolve_dependencies()
+            self._node_done = {
+                node_id: asyncio.Event() for node_id in self.state.node_states
+            }
+            self._node_tasks = {
+                node.id: asyncio.create_task(
+                    self._run_node(node, layer, dependencies[node.id], user_message)
+                )
+                for layer in self.config.layers
+                for node in layer.nodes
+            }
+            pending = set(self._node_tasks.values())
 
-                # Build input for this layer
-                if layer.level == 0:
-                    layer_input = user_message
-                else:
-                    # Combine previous layer outputs for aggregators
-                    layer_input = self._format_aggregator_input(
-                        user_message, previous_outputs
+            # Later layers wait for the early-exit decision on the first layer
+            self._early_exit_decided = asyncio.Event()
+            if self.config.early_exit_threshold is not None and len(self.config.layers) > 1:
+                pending.add(asyncio.create_task(self._decide_early_exit()))
+            else:
+                self._early_exit_decided.set()
+            cancel_requested = asyncio.create_task(self._cancel_requested.wait())
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending | {cancel_requested},
+                        timeout=self._remaining(),
+                        return_when=asyncio.FIRST_COMPLETED,
                     )
+                    pending.discard(cancel_requested)
+                    # Stragglers released by a quorum finish after we return
+                    pending -= self._background_tasks
+                    if self._cancel_requested.is_set():
+                        # Abandoned by the client: stop everything, stragglers too
+                        await self._cancel_tasks(
+                            pending | self._background_tasks, "Execution cancelled"
+                        )
+                        pending = set()
+                    elif pending and not done:
+                        # Deadline hit: stop what is still running, keep the rest
+                        self.state.deadline_exceeded = True
+                        await self._cancel_tasks(pending, "Deadline exceeded")
+                        pending = set()
+            finally:
+                cancel_requested.cancel()
+                for task in pending:
+                    task.cancel()
 
-                # Execute all nodes in this layer in parallel
-                layer_outputs = await self._execute_layer(layer.nodes, layer_input)
-                previous_outputs = layer_outputs
+            if self._cancel_requested.is_set():
+                self.state.status = "cancelled"
+                self.state.completed_at = datetime.utcnow()
+                self._broadcast_pipeline_status()
+                return self.state
 
-            # Final output is the last layer's output
-            if previous_outputs:
-                self.state.final_output = previous_outputs[0] if len(previous_outputs) == 1 else previous_outputs[0]
+            # Final output is the first successful node of the last layer
+            if self.config.layers and not self.state.early_exit:
+                for node in self.config.layers[-1].nodes:
+                    node_state = self.state.node_states[node.id]
+                    if node_state.status == NodeStatus.COMPLETED:
+                        self.state.final_output = node_state.output
+                        break
+                if self.state.final_output is None and self.state.deadline_exceeded:
+                    await self._select_partial_output()
 
-            # Calculate overall consensus
+            # Calculate overall consensus off the event loop for large outputs
             all_outputs = [
                 state.output
                 for state in self.state.node_states.values()
                 if state.output
             ]
-            self.state.consensus_score = self.consensus_calculator.calculate_pairwise_consensus(
-                all_outputs
+            self.state.consensus_score, self.state.common_themes = await self._run_consensus(
+                ConsensusCalculator.summarize, all_outputs
             )
 
-            self.state.status = "completed"
+            self.state.status = "partial" if self.state.deadline_exceeded else "completed"
             self.state.completed_at = datetime.utcnow()
 
-        except Exception as e:
+        except asyncio.CancelledError:
+            # Cancelled from outside (e.g. a closed stream): stop the nodes too
+            await self._cancel_tasks(
+                set(self._node_tasks.values()) | self._background_tasks,
+                "Execution cancelled",
+            )
+            self.state.status = "cancelled"
+            self.state.completed_at = datetime.utcnow()
+            self._broadcast_pipeline_status()
+            raise
+        except Exception:
             self.state.status = "error"
             self.state.completed_at = datetime.utcnow()
+            self._broadcast_pipeline_status()
             raise
+        finally:
+            execution_registry.unregister(self)
+            self._roll_up_usage()
+            self._observe_durations()
+            execution_history.record(self.state, user_message)
+            if (
+                self.state.conversation_id
+                and self.state.final_output
+                and self.state.status in ("completed", "partial")
+            ):
+                conversation_memory.add_turn(
+                    self.state.conversation_id, user_message, self.state.final_output
+                )
 
-        await self._broadcast_pipeline_status()
+        self._broadcast_pipeline_status()
+        self._detach_stragglers(user_message)
         return self.state
 
-    async def _execute_layer(
-        self, nodes: List[NodeConfig], layer_input: str
-    ) -> List[str]:
-        """Execute all nodes in a layer in parallel."""
-        tasks = [self._execute_node(node, layer_input) for node in nodes]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        outputs = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                # Node failed, error already recorded in state
+    def _detach_stragglers(self, user_message: str):
+        """Let stragglers released by a quorum finish after the execution returns.
+
+        Their nodes keep publishing updates; once all are done the usage
+        totals, the history record and the pipeline status are updated again.
+        """
+        running = {task for task in self._background_tasks if not task.done()}
+        if not running:
+            return
+        task = asyncio.create_task(self._finish_stragglers(running, user_message))
+        _detached_tasks.add(task)
+        task.add_done_callback(_detached_tasks.discard)
+
+    async def _finish_stragglers(self, tasks: set, user_message: str):
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._roll_up_usage()
+        execution_history.record(self.state, user_message)
+        self._broadcast_pipeline_status()
+
+    def _roll_up_usage(self):
+        """Total the token usage and cost of nodes that called a provider."""
+        node_states = self.state.node_states.values()
+        self.state.prompt_tokens = sum(state.prompt_tokens or 0 for state in node_states)
+        self.state.completion_tokens = sum(state.completion_tokens or 0 for state in node_states)
+        self.state.cost = sum(state.cost or 0.0 for state in node_states)
+
+    def _observe_durations(self):
+        """Record pipeline and per-layer wall times in the metrics."""
+        state = self.state
+        if state.started_at and state.completed_at:
+            metrics.pipeline_duration.observe(
+                (state.completed_at - state.started_at).total_seconds(),
+                state.pipeline_id,
+                state.status,
+            )
+        for layer in self.config.layers:
+            node_states = [
+                state.node_states[node.id] for node in layer.nodes
+                if state.node_states[node.id].started_at
+            ]
+            finished = [node_state.completed_at for node_state in node_states if node_state.completed_at]
+            if node_states and finished:
+                metrics.layer_duration.observe(
+                    (max(finished) - min(node_state.started_at for node_state in node_states)).total_seconds(),
+                    state.pipeline_id,
+                    str(layer.level),
+                )
+
+    def cancel(self):
+        """Stop the execution, cancelling outstanding nodes and their streams.
+
+        Safe to call before the execution starts or after it has finished.
+        """
+        self._cancel_requested.set()
+
+    async def _cancel_tasks(self, tasks: set, reason: str):
+        """Cancel node tasks, wait for them to stop and mark unfinished nodes."""
+        self._cancel_reason = reason
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Nodes cancelled before they started never saw the CancelledError
+        for node_id, node_state in self.state.node_states.items():
+            if node_state.status in (NodeStatus.PENDING, NodeStatus.RUNNING):
+                node_state.status = NodeStatus.CANCELLED
+                node_state.error = reason
+                node_state.completed_at = datetime.utcnow()
+                self._broadcast_node_status(node_id)
+
+    async def execute_stream(self, user_message: str) -> AsyncIterator[str]:
+        """Execute the pipeline, yielding the final node's tokens as they arrive.
+
+        The completed state is available on `self.state` once the iterator
+        is exhausted; execution errors are re-raised from the iterator.
+        """
+        self.stream = True
+        queue: asyncio.Queue = asyncio.Queue()
+        self._delta_sink = queue.put_nowait
+        self._held_deltas = {
+            node.id: [] for node in self.config.layers[-1].nodes if node.id != self._stream_node_id
+        } if self.config.layers else {}
+
+        task = asyncio.create_task(self.execute(user_message))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+
+        try:
+            while True:
+                delta = await queue.get()
+                if delta is None:
+                    break
+                yield delta
+            await task
+        finally:
+            # The caller went away (or the stream was closed early)
+            if not task.done():
+                self.cancel()
+
+    def _resolve_dependencies(self) -> Dict[str, List[str]]:
+        """Map each node to the upstream node ids whose outputs it consumes.
+
+        Nodes without explicit `inputs` depend on the whole previous layer;
+        first-layer nodes depend on nothing and receive the user message.
+        """
+        dependencies: Dict[str, List[str]] = {}
+        previous_ids: List[str] = []
+        for layer in self.config.layers:
+            for node in layer.nodes:
+                dependencies[node.id] = (
+                    list(node.inputs) if node.inputs is not None else previous_ids
+                )
+            previous_ids = [node.id for node in layer.nodes]
+        return dependencies
+
+    async def _run_node(
+        self,
+        node: NodeConfig,
+        layer: PipelineLayer,
+        dependencies: List[str],
+        user_message: str,
+    ):
+        """Wait for a node's inputs, then execute it."""
+        try:
+            if layer is not self.config.layers[0]:
+                await self._early_exit_decided.wait()
+                if self.state.early_exit:
+                    node_state = self.state.node_states[node.id]
+                    node_state.status = NodeStatus.SKIPPED
+                    self._broadcast_node_status(node.id)
+                    return
+
+            for dependency in dependencies:
+                await self._node_done[dependency].wait()
+
+            if dependencies:
+                # Combine upstream outputs for aggregators, in edge order
+                input_text = self._format_aggregator_input(
+                    user_message,
+                    [
+                        self.state.node_states[dependency].output
+                        for dependency in dependencies
+                        if self.state.node_states[dependency].status == NodeStatus.COMPLETED
+                    ],
+                )
+            else:
+                input_text = user_message
+
+            if layer.level > self.state.current_layer:
+                self.state.current_layer = layer.level
+                self._broadcast_pipeline_status()
+
+            with tracer.span(
+                "node",
+                parent=self._layer_span(layer.level),
+                node_id=node.id,
+                role=node.role.value,
+                provider=node.provider,
+                model=node.model,
+            ) as span:
+                try:
+                    await self._execute_node(node, input_text)
+                finally:
+                    node_state = self.state.node_states[node.id]
+                    span.set_attributes(
+                        served_by=node_state.served_by,
+                        attempts=node_state.attempts,
+                        cached=node_state.cached,
+                        prompt_tokens=node_state.prompt_tokens,
+                        completion_tokens=node_state.completion_tokens,
+                        cost=node_state.cost,
+                    )
+        except asyncio.CancelledError:
+            node_state = self.state.node_states[node.id]
+            if node_state.status in (NodeStatus.PENDING, NodeStatus.RUNNING):
+                node_state.status = NodeStatus.CANCELLED
+                node_state.error = self._node_cancel_reasons.get(node.id, self._cancel_reason)
+                node_state.completed_at = datetime.utcnow()
+                self._broadcast_node_status(node.id)
+            raise
+        except Exception:
+            # Node failed, error already recorded in state
+            pass
+        finally:
+            if self.state.node_states[node.id].status != NodeStatus.COMPLETED:
+                self._switch_stream_node(node.id)
+            self._node_done[node.id].set()
+            self._check_quorum(layer)
+
+    def _layer_span(self, level: int):
+        """The layer's span, started when its first node starts.
+
+        Layer spans end with the execution, so stragglers released by a
+        quorum may outlive theirs.
+        """
+        span = self._layer_spans.get(level)
+        if span is None:
+            span = self._layer_spans[level] = tracer.start_span(
+                "layer", parent=self._span, level=level
+            )
+        return span
+
+    async def _decide_early_exit(self):
+        """Skip the remaining layers if the first layer already agrees strongly."""
+        try:
+            first_layer = self.config.layers[0]
+            for node in first_layer.nodes:
+                await self._node_done[node.id].wait()
+
+            outputs = [
+                self.state.node_states[node.id].output
+                for node in first_layer.nodes
+                if self.state.node_states[node.id].status == NodeStatus.COMPLETED
+            ]
+            score = self.state.layer_consensus.get(first_layer.level)
+            if len(outputs) < 2 or score is None or score < self.config.early_exit_threshold:
+                return
+
+            _, central = await self._run_consensus(
+                ConsensusCalculator.find_most_central_response, outputs
+            )
+            self.state.final_output = central
+            self.state.early_exit = True
+            self.state.skipped_layers = [layer.level for layer in self.config.layers[1:]]
+            if self._delta_sink:
+                # Streaming callers receive the chosen answer in one chunk
+                self._delta_sink(central)
+        finally:
+            self._early_exit_decided.set()
+
+    async def _select_partial_output(self):
+        """Pick a final output from the deepest layer that produced any.
+
+        Used when the deadline cancels the last layer; among several outputs
+        the most central one is chosen.
+        """
+        for layer in reversed(self.config.layers):
+            outputs = [
+                self.state.node_states[node.id].output
+                for node in layer.nodes
+                if self.state.node_states[node.id].status == NodeStatus.COMPLETED
+            ]
+            if not outputs:
                 continue
-            outputs.append(result)
+            if len(outputs) == 1:
+                self.state.final_output = outputs[0]
+            else:
+                _, self.state.final_output = await self._run_consensus(
+                    ConsensusCalculator.find_most_central_response, outputs
+                )
+            if self._delta_sink and self._stream_node_id not in self._streamed_nodes:
+                self._delta_sink(self.state.final_output)
+            return
 
-        return outputs
+    async def _run_consensus(self, func: Callable, outputs: List[str]):
+        """Run a consensus computation, off the event loop for large outputs."""
+        started = time.perf_counter()
+        size = sum(len(output) for output in outputs)
+        try:
+            with tracer.span(
+                "consensus", operation=func.__name__, outputs=len(outputs), characters=size
+            ):
+                return await consensus_pool.run(size, func, outputs)
+        finally:
+            metrics.consensus_duration.observe(time.perf_counter() - started, func.__name__)
+
+    def _remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one."""
+        if self._deadline_at is None:
+            return None
+        return max(0.0, self._deadline_at - time.monotonic())
+
+    def _call_timeout(self, node: NodeConfig) -> Optional[float]:
+        """Timeout for one provider call: the node's limit within the deadline."""
+        limits = [
+            limit
+            for limit in (
+                node.timeout if node.timeout is not None else settings.node_timeout,
+                self._remaining(),
+            )
+            if limit is not None
+        ]
+        return min(limits) if limits else None
+
+    def _check_quorum(self, layer: PipelineLayer):
+        """Release a layer's dependents once its quorum of nodes has completed."""
+        if layer.quorum is None:
+            return
+
+        completed = sum(
+            1 for node in layer.nodes
+            if self.state.node_states[node.id].status == NodeStatus.COMPLETED
+        )
+        if completed < layer.quorum:
+            return
+
+        for node in layer.nodes:
+            done = self._node_done[node.id]
+            if done.is_set():
+                continue
+            # Dependents stop waiting on this straggler
+            done.set()
+            task = self._node_tasks[node.id]
+            if layer.straggler_policy == StragglerPolicy.CANCEL:
+                self._node_cancel_reasons[node.id] = "Cancelled after quorum reached"
+                task.cancel()
+            else:
+                self._background_tasks.add(task)
 
     async def _execute_node(self, node: NodeConfig, input_text: str) -> str:
         """Execute a single node."""
         node_state = self.state.node_states[node.id]
         node_state.status = NodeStatus.RUNNING
         node_state.started_at = datetime.utcnow()
+        started = time.perf_counter()
 
-        await self._broadcast_node_status(node.id)
+        self._broadcast_node_status(node.id)
 
         try:
-            # Get provider
-            provider_class = provider_registry.get(node.provider)
-            if not provider_class:
-                raise ValueError(f"Provider '{node.provider}' not found")
+            # Build messages
+            messages = list(self._system_messages[node.id])
+            if node.role == NodeRole.GENERATOR:
+                # Generators answer in the context of the conversation so far
+                messages.extend(self._context_messages)
+            messages.append({"role": "user", "content": input_text})
 
-            provider = provider_class()
+            # Serve deterministic calls from the response cache when possible
+            cacheable = response_cache.enabled and response_cache.is_cacheable(node)
+            result = None
+            if cacheable:
+                result = await response_cache.get(response_cache.make_key(
+                    node.provider, node.model, messages, node.temperature, node.max_tokens
+                ))
 
-            # Build messages
-            messages = []
-            if node.system_prompt:
-                messages.append({"role": "system", "content": node.system_prompt})
-            elif node.role == NodeRole.GENERATOR:
-                messages.append({
-                    "role": "system",
-                    "content": "You are a helpful assistant. Provide a clear and comprehensive answer.",
-                })
+            if result is not None:
+                node_state.cached = True
+                if self.stream:
+                    self._publish_delta(node.id, result.text)
+            else:
+                # Call LLM, retrying and failing over to fallbacks as needed
+                result = await self._call_with_failover(node, messages)
 
-            messages.append({"role": "user", "content": input_text})
+                if cacheable:
+                    # Keyed by the model that answered, which after a failover
+                    # or a winning hedge is not the node's own
+                    served_provider, served_model = node_state.served_by.split(":", 1)
+                    await response_cache.set(
+                        response_cache.make_key(
+                            served_provider, served_model, messages, node.temperature, node.max_tokens
+                        ),
+                        result,
+                    )
 
-            # Call LLM
-            response = await provider.generate(
-                model=node.model,
-                messages=messages,
-                temperature=node.temperature,
-                max_tokens=node.max_tokens,
-            )
+                node_state.prompt_tokens = result.prompt_tokens
+                node_state.completion_tokens = result.completion_tokens
+                node_state.tokens_used = result.prompt_tokens + result.completion_tokens
+                node_state.ttft = result.ttft
+                node_state.latency = result.latency
+                node_state.cost = result.cost
 
-            node_state.output = response
+            node_state.output = result.text
             node_state.status = NodeStatus.COMPLETED
             node_state.completed_at = datetime.utcnow()
 
+            # Fold this output into its layer's running consensus
+            level = self._node_levels[node.id]
+            consensus_started = time.perf_counter()
+            with tracer.span("consensus", operation="incremental", level=level):
+                self.state.layer_consensus[level] = self._layer_consensus[level].add(result.text)
+            metrics.consensus_duration.observe(
+                time.perf_counter() - consensus_started, "incremental"
+            )
+
         except Exception as e:
             node_state.status = NodeStatus.ERROR
             node_state.error = str(e)
             node_state.completed_at = datetime.utcnow()
-            await self._broadcast_node_status(node.id)
+            metrics.node_duration.observe(
+                time.perf_counter() - started, node.provider, node.model, node.role.value, "error"
+            )
+            self._broadcast_node_status(node.id)
             raise
 
-        await self._broadcast_node_status(node.id)
+        metrics.node_duration.observe(
+            time.perf_counter() - started, node.provider, node.model, node.role.value, "completed"
+        )
+
+        self._broadcast_node_status(node.id)
         return node_state.output
 
+    def _get_provider(self, name: str) -> BaseProvider:
+        """Get the shared provider instance by name."""
+        provider = provider_registry.get_instance(name)
+        if not provider:
+            raise ValueError(f"Provider '{name}' not found")
+        return provider
+
+    async def _call_with_failover(
+        self, node: NodeConfig, messages: List[Dict[str, str]]
+    ) -> GenerationResult:
+        """Call the node's model, then its fallbacks, retrying transient errors.
+
+        Providers whose circuit breaker is open are skipped without waiting
+        on them. A streamed node is never retried once it has emitted output.
+        """
+        node_state = self.state.node_states[node.id]
+        policy = RetryPolicy(
+            max_retries=node.max_retries if node.max_retries is not None else settings.provider_max_retries,
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+        )
+        candidates = [(node.provider, node.model)] + [
+            tuple(fallback.split(":", 1)) for fallback in node.fallbacks
+        ]
+
+        error: Optional[BaseException] = None
+        for provider_name, model in candidates:
+            breaker = circuit_breakers.get(provider_name)
+            if not breaker.allow():
+                error = error or RuntimeError(f"Provider '{provider_name}' circuit is open")
+                continue
+
+            for attempt in range(policy.max_retries + 1):
+                node_state.attempts += 1
+                timeout = self._call_timeout(node)
+                try:
+                    if self.stream:
+                        call = self._stream_node(node, provider_name, model, messages, timeout)
+                    else:
+                        call = self._generate(node, provider_name, model, messages, timeout)
+                    try:
+                        response, served_provider, served_model = await asyncio.wait_for(
+                            call, timeout
+                        )
+                    except asyncio.TimeoutError:
+                        # The provider's own timeout fires even without a node limit
+                        limit = f" after {timeout:.1f}s" if timeout is not None else ""
+                        raise TimeoutError(f"{provider_name}:{model} timed out{limit}") from None
+                except Exception as e:
+                    error = e
+                    metrics.provider_errors.inc(provider_name, model)
+                    if self._remaining() == 0:
+                        # Out of budget; not the provider's fault, nothing left to try
+                        raise
+                    retryable = is_retryable(e, self._transient_errors(provider_name))
+                    if retryable:
+                        breaker.record_failure()
+                    if node.id in self._streamed_nodes:
+                        raise
+                    if not retryable or attempt == policy.max_retries or not breaker.allow():
+                        break
+                    delay = policy.delay(attempt)
+                    remaining = self._remaining()
+                    if remaining is not None and delay >= remaining:
+                        raise
+                    metrics.provider_retries.inc(provider_name, model)
+                    await asyncio.sleep(delay)
+                else:
+                    # A winning hedge may be another model than the one called
+                    circuit_breakers.get(served_provider).record_success()
+                    node_state.served_by = f"{served_provider}:{served_model}"
+                    self._observe_call(served_provider, served_model, response)
+                    return response
+
+        raise error
+
+    @staticmethod
+    def _transient_errors(provider_name: str) -> Tuple[Type[BaseException], ...]:
+        """The provider SDK's retryable connection and timeout errors."""
+        provider_class = provider_registry.get(provider_name)
+        return provider_class.transient_errors if provider_class else ()
+
+    @staticmethod
+    def _observe_call(provider_name: str, model: str, result: GenerationResult):
+        """Record a successful provider call's latency, tokens and cost."""
+        metrics.provider_call_duration.observe(result.latency, provider_name, model)
+        if result.ttft is not None:
+            metrics.provider_ttft.observe(result.ttft, provider_name, model)
+        metrics.provider_tokens.inc(provider_name, model, "prompt", amount=result.prompt_tokens)
+        metrics.provider_tokens.inc(provider_name, model, "completion", amount=result.completion_tokens)
+        if result.cost:
+            metrics.provider_cost.inc(provider_name, model, amount=result.cost)
+
+    async def _generate(
+        self,
+        node: NodeConfig,
+        provider_name: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        timeout: Optional[float] = None,
+    ) -> Tuple[GenerationResult, str, str]:
+        """Call a model, hedging the node's primary model if it runs long.
+
+        Returns the result with the provider and model that produced it.
+        Only non-streamed calls are hedged; see `_stream_node`.
+        """
+        primary = asyncio.create_task(
+            self._timed_generate(provider_name, model, node, messages, timeout)
+        )
+        tasks = {primary}
+        served = {primary: (provider_name, model)}
+
+        try:
+            hedge_delay = self._hedge_delay(node)
+            if hedge_delay is None or (provider_name, model) != (node.provider, node.model):
+                return (await primary, provider_name, model)
+
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                hedge_provider = node.hedge.provider or node.provider
+                hedge_model = node.hedge.model or node.model
+                hedge = asyncio.create_task(
+                    self._timed_generate(hedge_provider, hedge_model, node, messages, timeout)
+                )
+                tasks.add(hedge)
+                served[hedge] = (hedge_provider, hedge_model)
+
+            # First successful response wins; fail only if every attempt fails
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return (task.result(), *served[task])
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _timed_generate(
+        self,
+        provider_name: str,
+        model: str,
+        node: NodeConfig,
+        messages: List[Dict[str, str]],
+        timeout: Optional[float] = None,
+    ) -> GenerationResult:
+        """Call a provider and record its latency for hedging decisions."""
+        provider = self._get_provider(provider_name)
+        with tracer.span("provider.call", provider=provider_name, model=model, stream=False) as span:
+            queued = time.perf_counter()
+            async with self._provider_slot(provider_name, model, messages, node.max_tokens) as reservation:
+                span.set_attributes(slot_wait=time.perf_counter() - queued)
+                result = await provider.generate(
+                    model=model,
+                    messages=messages,
+                    temperature=node.temperature,
+                    max_tokens=node.max_tokens,
+                    **self._timeout_kwargs(timeout),
+                )
+                reservation.settle(result.prompt_tokens + result.completion_tokens)
+            self._annotate_call(span, result)
+        latency_tracker.record(f"{provider_name}:{model}", result.latency)
+        return result
+
+    @staticmethod
+    def _timeout_kwargs(timeout: Optional[float]) -> Dict[str, float]:
+        """Provider kwargs so the HTTP request itself gives up at the timeout."""
+        return {"timeout": timeout} if timeout is not None else {}
+
+    @contextlib.asynccontextmanager
+    async def _provider_slot(
+        self,
+        provider_name: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+    ):
+        """Hold the run's and the process-wide budget for one provider call.
+
+        Yields the rate limiter's token reservation, to be settled with the
+        call's real usage.
+        """
+        semaphore = self._provider_semaphores.get(provider_name)
+        async with semaphore if semaphore is not None else contextlib.nullcontext():
+            async with rate_limiter.limit(
+                provider_name,
+                model,
+                rate_limiter.estimate_tokens(messages, max_tokens),
+            ) as reservation:
+                yield reservation
+
+    def _hedge_delay(self, node: NodeConfig) -> Optional[float]:
+        """Seconds to wait before hedging, or None if the node is not hedged."""
+        if node.hedge is None:
+            return None
+        if node.hedge.delay is not None:
+            return node.hedge.delay
+
+        observed = latency_tracker.percentile(
+            f"{node.provider}:{node.model}",
+            settings.hedge_percentile,
+            min_samples=settings.hedge_min_samples,
+        )
+        return observed if observed is not None else settings.hedge_default_delay
+
+    async def _stream_node(
+        self,
+        node: NodeConfig,
+        provider_name: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        timeout: Optional[float] = None,
+    ) -> Tuple[GenerationResult, str, str]:
+        """Stream a node's response, publishing each delta as it arrives.
+
+        Streamed calls are not hedged: their deltas are published as they
+        arrive, and a second stream could not take over without clients
+        receiving both.
+
+        Returns the result with the provider and model, like `_generate`.
+        """
+        provider = self._get_provider(provider_name)
+        result: Optional[GenerationResult] = None
+        stream = provider.stream_generate(
+            model=model,
+            messages=messages,
+            temperature=node.temperature,
+            max_tokens=node.max_tokens,
+            **self._timeout_kwargs(timeout),
+        )
+        with tracer.span("provider.call", provider=provider_name, model=model, stream=True) as span:
+            queued = time.perf_counter()
+            # Close the provider stream (and its connection) as soon as we stop
+            async with self._provider_slot(provider_name, model, messages, node.max_tokens) as reservation:
+                span.set_attributes(slot_wait=time.perf_counter() - queued)
+                async with contextlib.aclosing(stream):
+                    async for item in stream:
+                        if isinstance(item, GenerationResult):
+                            result = item
+                            reservation.settle(result.prompt_tokens + result.completion_tokens)
+                        else:
+                            self._publish_delta(node.id, item)
+
+            if result is None:
+                raise RuntimeError(f"Provider '{provider_name}' stream ended without a result")
+            self._annotate_call(span, result)
+        return result, provider_name, model
+
+    @staticmethod
+    def _annotate_call(span, result: GenerationResult):
+        """Attach a provider call's usage to its trace span."""
+        span.set_attributes(
+            prompt_tokens=result.prompt_tokens,
+            completion_tokens=result.completion_tokens,
+            ttft=result.ttft,
+            latency=result.latency,
+            cost=result.cost,
+        )
+
+    def _publish_delta(self, node_id: str, delta: str):
+        """Send a chunk to WebSocket clients and, for the streamed node, the caller."""
+        self._streamed_nodes.add(node_id)
+        if node_id == self._stream_node_id and self._delta_sink:
+            self._delta_sink(delta)
+        elif node_id in self._held_deltas:
+            self._held_deltas[node_id].append(delta)
+        self._broadcast_node_delta(node_id, delta)
+
+    def _switch_stream_node(self, node_id: str):
+        """Feed the caller from another final node when the streamed one stopped.
+
+        Only switches while the caller has received nothing; the new node's
+        deltas so far are sent at once. A node that fails mid-answer keeps
+        the stream, since splicing in a second output would garble it.
+        """
+        if node_id != self._stream_node_id or node_id in self._streamed_nodes:
+            return
+        for candidate, deltas in self._held_deltas.items():
+            if self.state.node_states[candidate].status in (
+                NodeStatus.PENDING, NodeStatus.RUNNING, NodeStatus.COMPLETED
+            ):
+                self._stream_node_id = candidate
+                del self._held_deltas[candidate]
+                for delta in deltas:
+                    self._delta_sink(delta)
+                return
+
     def _format_aggregator_input(
         self, original_question: str, previous_outputs: List[str]
     ) -> str:
@@ -155,23 +1012,40 @@ class PipelineExecutor:
         formatted += "\n---\n\nPlease analyze these responses and provide a synthesized answer."
         return formatted
 
-    async def _broadcast_node_status(self, node_id: str):
-        """Broadcast node status update via WebSocket."""
+    def _broadcast_node_status(self, node_id: str):
+        """Publish a node status update for WebSocket clients."""
+        if not self.publish_events:
+            return
         node_state = self.state.node_states[node_id]
         event = NodeUpdateEvent(
+            execution_id=self.state.execution_id,
             node_id=node_id,
             status=node_state.status,
             output=node_state.output,
             error=node_state.error,
+            consensus_score=self.state.layer_consensus.get(self._node_levels[node_id]),
+        )
+        event_bus.publish(event.model_dump(mode="json"))
+
+    def _broadcast_node_delta(self, node_id: str, delta: str):
+        """Publish an incremental node output chunk for WebSocket clients."""
+        if not self.publish_events:
+            return
+        event = NodeDeltaEvent(
+            execution_id=self.state.execution_id,
+            node_id=node_id,
+            delta=delta,
         )
-        await broadcast_node_update(event.model_dump())
+        event_bus.publish(event.model_dump(mode="json"))
 
-    async def _broadcast_pipeline_status(self):
-        """Broadcast pipeline status update via WebSocket."""
+    def _broadcast_pipeline_status(self):
+        """Publish a pipeline status update for WebSocket clients."""
+        if not self.publish_events:
+            return
         total_nodes = len(self.state.node_states)
         completed_nodes = sum(
             1 for state in self.state.node_states.values()
-            if state.status in (NodeStatus.COMPLETED, NodeStatus.ERROR)
+            if state.status not in (NodeStatus.PENDING, NodeStatus.RUNNING)
         )
         progress = completed_nodes / total_nodes if total_nodes > 0 else 0
 
@@ -182,4 +1056,4 @@ class PipelineExecutor:
             "current_layer": self.state.current_layer,
             "progress": progress,
         }
-        await broadcast_pipeline_update(event)
+        event_bus.publish(event)
@@ -0,0 +1,286 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from app.models.node import NodeConfig
+from app.providers.base import GenerationResult
+from app.config import settings
+
+
+class CacheBackend(ABC):
+    """Abstract storage backend for cached node responses."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None if missing or expired."""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        pass
+
+    @abstractmethod
+    async def clear(self) -> int:
+        """Remove every entry and return how many were removed."""
+        pass
+
+    @abstractmethod
+    async def size(self) -> int:
+        """Return the number of stored entries."""
+        pass
+
+    @abstractmethod
+    async def entries(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """List the most recently used entries for inspection."""
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (created_at, expires_at, value), ordered oldest access first
+        self._entries: "OrderedDict[str, Tuple[float, float, str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    async def set(self, key: str, value: str) -> None:
+        now = time.time()
+        self._entries[key] = (now, now + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> int:
+        removed = len(self._entries)
+        self._entries.clear()
+        return removed
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+    async def entries(self, limit: int = 50) -> List[Dict[str, Any]]:
+        keys = list(reversed(self._entries))[:limit]
+        return [
+            _describe_entry(key, *self._entries[key])
+            for key in keys
+        ]
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """On-disk LRU cache with per-entry TTL, shared across restarts.
+
+    Queries run in a worker thread so disk I/O never blocks the event loop.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_response_cache_accessed "
+            "ON response_cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def _run(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._conn.commit()
+            return rows
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return row[0]
+
+    def _set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache "
+                "(key, value, created_at, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now + self.ttl, now),
+            )
+            self._conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                """
+                DELETE FROM response_cache WHERE key IN (
+                    SELECT key FROM response_cache ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str) -> None:
+        await asyncio.to_thread(self._set, key, value)
+
+    async def clear(self) -> int:
+        removed = await self.size()
+        await asyncio.to_thread(self._run, "DELETE FROM response_cache")
+        return removed
+
+    async def size(self) -> int:
+        rows = await asyncio.to_thread(self._run, "SELECT COUNT(*) FROM response_cache")
+        return rows[0][0]
+
+    async def entries(self, limit: int = 50) -> List[Dict[str, Any]]:
+        rows = await asyncio.to_thread(
+            self._run,
+            "SELECT key, created_at, expires_at, value FROM response_cache "
+            "ORDER BY accessed_at DESC LIMIT ?",
+            (limit,),
+        )
+        return [_describe_entry(*row) for row in rows]
+
+
+def _describe_entry(key: str, created_at: float, expires_at: float, value: str) -> Dict[str, Any]:
+    return {
+        "key": key,
+        "created_at": created_at,
+        "expires_at": expires_at,
+        "preview": value[:200],
+    }
+
+
+class ResponseCache:
+    """Exact-match cache for node responses with hit/miss statistics.
+
+    Results are stored as JSON so cached nodes keep their token counts.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend]):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def is_cacheable(node: NodeConfig) -> bool:
+        """Only deterministic calls are cached unless the node opts in or out."""
+        if node.cache is not None:
+            return node.cache
+        return node.temperature == 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+    ) -> str:
+        payload = json.dumps(
+            [provider, model, messages, temperature, max_tokens],
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[GenerationResult]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            return GenerationResult(**json.loads(value))
+        except (ValueError, TypeError):
+            # Entry written before results were stored as JSON
+            return GenerationResult(text=value)
+
+    async def set(self, key: str, result: GenerationResult) -> None:
+        await self.backend.set(key, json.dumps(dataclasses.asdict(result)))
+        self.stores += 1
+
+    async def purge(self) -> int:
+        """Remove every cached response and return how many were removed."""
+        if not self.enabled:
+            return 0
+        return await self.backend.clear()
+
+    async def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "entries": await self.backend.size() if self.enabled else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the response cache configured in settings."""
+    backend: Optional[CacheBackend] = None
+    if settings.response_cache_backend == "memory":
+        backend = MemoryCacheBackend(
+            max_entries=settings.response_cache_max_entries,
+            ttl=settings.response_cache_ttl,
+        )
+    elif settings.response_cache_backend == "sqlite":
+        backend = SQLiteCacheBackend(
+            settings.response_cache_path,
+            max_entries=settings.response_cache_max_entries,
+            ttl=settings.response_cache_ttl,
+        )
+    return ResponseCache(backend)
+
+
+# Global cache shared by all executions
+response_cache = create_response_cache()
@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+import random
+import time
+import uuid
+
+from app.models.pipeline import PipelineState
+from app.utils.similarity import tokenize, jaccard_token_sets, word_shingles
+from app.config import settings
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_HASH_MASK = (1 << 61) - 1
+
+# Words that flip or change a question's meaning however similar the rest is
+_NEGATIONS = frozenset(
+    ["not", "no", "never", "without", "nor", "neither", "none", "cannot", "t"]
+)
+
+
+def _changes_meaning(tokens: FrozenSet[str], other: FrozenSet[str]) -> bool:
+    """Whether two messages differ in a negation or a number."""
+    return any(token in _NEGATIONS or token.isdigit() for token in tokens ^ other)
+
+
+@dataclass
+class _CachedResult:
+    pipeline_id: str
+    normalized: str
+    tokens: FrozenSet[str]
+    shingles: FrozenSet[str]
+    bands: List[int]
+    state: PipelineState
+    expires_at: float
+
+
+class PipelineResultCache:
+    """Near-duplicate cache for whole-pipeline results.
+
+    Messages are normalized to their token sequence; an exact normalized
+    match is a dict lookup, and near-duplicates are found through MinHash LSH
+    buckets and then verified with the Jaccard similarity of their word
+    bigrams, so a lookup only compares against a handful of candidates
+    regardless of cache size. Bigrams keep word order, so "from MySQL to
+    Postgres" does not match "from Postgres to MySQL"; candidates that differ
+    in a negation or a number are rejected however similar they are.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_entries: int = 50000,
+        ttl: float = 3600.0,
+        num_bands: int = 16,
+        rows_per_band: int = 4,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.num_bands = num_bands
+        self.rows_per_band = rows_per_band
+
+        rng = random.Random(0)
+        num_perm = num_bands * rows_per_band
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+        self._entries: "OrderedDict[str, _CachedResult]" = OrderedDict()
+        self._exact: Dict[Tuple[str, str], str] = {}
+        self._buckets: Dict[Tuple[str, int, int], Set[str]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def _signature_bands(self, shingles: FrozenSet[str]) -> List[int]:
+        """Compute the MinHash signature and hash it into LSH band keys."""
+        hashes = [hash(shingle) & _HASH_MASK for shingle in shingles]
+        signature = [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._permutations
+        ]
+        rows = self.rows_per_band
+        return [
+            hash(tuple(signature[band * rows:(band + 1) * rows]))
+            for band in range(self.num_bands)
+        ]
+
+    def lookup(self, pipeline_id: str, message: str) -> Optional[PipelineState]:
+        """Return a copy of a cached result for a near-identical message."""
+        token_list = tokenize(message)
+        if not token_list:
+            self.misses += 1
+            return None
+        normalized = " ".join(token_list)
+
+        entry_id = self._exact.get((pipeline_id, normalized))
+        if entry_id is None:
+            tokens = frozenset(token_list)
+            shingles = word_shingles(token_list)
+            candidates: Set[str] = set()
+            for band, band_key in enumerate(self._signature_bands(shingles)):
+                candidates |= self._buckets.get((pipeline_id, band, band_key), set())
+
+            best_score = self.threshold
+            for candidate_id in candidates:
+                candidate = self._entries[candidate_id]
+                if _changes_meaning(tokens, candidate.tokens):
+                    continue
+                score = jaccard_token_sets(shingles, candidate.shingles)
+                if score >= best_score:
+                    entry_id, best_score = candidate_id, score
+
+        entry = self._entries.get(entry_id) if entry_id else None
+        if entry is None or entry.expires_at < time.time():
+            if entry is not None:
+                self._remove(entry_id)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(entry_id)
+        self.hits += 1
+        return entry.state.model_copy(
+            update={
+                "execution_id": str(uuid.uuid4()),
+                "cached_from": entry.state.execution_id,
+            },
+            deep=True,
+        )
+
+    def store(self, pipeline_id: str, message: str, state: PipelineState) -> None:
+        """Cache a completed pipeline result for the given message."""
+        if state.status != "completed" or not state.final_output:
+            return
+        token_list = tokenize(message)
+        if not token_list:
+            return
+        normalized = " ".join(token_list)
+
+        existing = self._exact.get((pipeline_id, normalized))
+        if existing:
+            self._remove(existing)
+
+        shingles = word_shingles(token_list)
+        entry_id = state.execution_id
+        entry = _CachedResult(
+            pipeline_id=pipeline_id,
+            normalized=normalized,
+            tokens=frozenset(token_list),
+            shingles=shingles,
+            bands=self._signature_bands(shingles),
+            state=state.model_copy(deep=True),
+            expires_at=time.time() + self.ttl,
+        )
+        self._entries[entry_id] = entry
+        self._exact[(pipeline_id, normalized)] = entry_id
+        for band, band_key in enumerate(entry.bands):
+            self._buckets.setdefault((pipeline_id, band, band_key), set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, entry_id: str) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        self._exact.pop((entry.pipeline_id, entry.normalized), None)
+        for band, band_key in enumerate(entry.bands):
+            key = (entry.pipeline_id, band, band_key)
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def invalidate(self, pipeline_id: Optional[str] = None) -> int:
+        """Drop cached results for one pipeline, or all of them."""
+        entry_ids = [
+            entry_id for entry_id, entry in self._entries.items()
+            if pipeline_id is None or entry.pipeline_id == pipeline_id
+        ]
+        for entry_id in entry_ids:
+            self._remove(entry_id)
+        return len(entry_ids)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Global cache shared by all chat requests
+result_cache = PipelineResultCache(
+    threshold=settings.result_cache_threshold,
+    max_entries=settings.result_cache_max_entries,
+    ttl=settings.result_cache_ttl,
+)
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple, Type
+import random
+
+from app.providers.base import TRANSIENT_ERRORS
+
+RETRYABLE_STATUSES = (408, 409, 429)
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+    max_retries: int = 2
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt + 1`."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    # OpenAI/Anthropic errors expose status_code, Mistral http_status,
+    # Google code, httpx errors carry the response
+    for attr in ("status_code", "http_status", "code"):
+        status = getattr(exc, attr, None)
+        if isinstance(status, int):
+            return status
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(
+    exc: BaseException,
+    transient_errors: Tuple[Type[BaseException], ...] = (),
+) -> bool:
+    """Whether an error is transient: timeouts, connection errors, 408/409/429 and 5xx.
+
+    `transient_errors` are the provider SDK's own connection and timeout
+    errors. Anything else, including errors with no status, is not retried.
+    """
+    if isinstance(exc, TRANSIENT_ERRORS + transient_errors):
+        return True
+    status = _status_code(exc)
+    return status is not None and (status in RETRYABLE_STATUSES or status >= 500)
@@ -0,0 +1,304 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+import asyncio
+import json
+import logging
+import random
+import time
+
+import httpx
+
+from app.core.batching import BatchWriter
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """One timed operation in a trace, with its attributes and outcome."""
+
+    sampled = True
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: Dict[str, Any],
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.status = "ok"  # ok, error, cancelled
+        self.error: Optional[str] = None
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        if isinstance(error, asyncio.CancelledError):
+            self.status = "cancelled"
+        else:
+            self.status = "error"
+            self.error = str(error) or type(error).__name__
+
+    def end(self) -> None:
+        """Finish the span and hand it to the exporter; later calls are ignored."""
+        if self.end_time is not None:
+            return
+        self.end_time = time.time_ns()
+        self.tracer._finish(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_ms": (self.end_time - self.start_time) / 1e6,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _UnsampledSpan:
+    """Stand-in for spans of traces that were not sampled; records nothing."""
+
+    sampled = False
+    trace_id = span_id = parent_id = None
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+UNSAMPLED = _UnsampledSpan()
+
+_current_span: ContextVar[Optional[Any]] = ContextVar("current_span", default=None)
+
+
+def current_span():
+    """The span active in this task, if any."""
+    return _current_span.get()
+
+
+class SpanExporter(ABC):
+    """Abstract destination for finished spans."""
+
+    @abstractmethod
+    async def export(self, spans: List[Span]) -> None:
+        """Send a batch of finished spans."""
+        pass
+
+    async def close(self) -> None:
+        """Release resources held by the exporter."""
+        pass
+
+
+class JSONLSpanExporter(SpanExporter):
+    """Appends one JSON object per span to a local file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, lines: List[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(lines)
+
+    async def export(self, spans: List[Span]) -> None:
+        lines = [json.dumps(span.to_dict(), default=str) + "\n" for span in spans]
+        await asyncio.to_thread(self._write, lines)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPSpanExporter(SpanExporter):
+    """Posts spans to an OpenTelemetry collector using OTLP/HTTP with JSON."""
+
+    # OTLP status codes
+    STATUS_OK = 1
+    STATUS_ERROR = 2
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str = "decisionllm",
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+    ):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self._client = httpx.AsyncClient(headers=headers or {}, timeout=timeout)
+
+    def _encode(self, span: Span) -> Dict[str, Any]:
+        encoded = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_time),
+            "endTimeUnixNano": str(span.end_time),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in span.attributes.items()
+                if value is not None
+            ],
+            "status": (
+                {"code": self.STATUS_OK}
+                if span.status == "ok"
+                else {"code": self.STATUS_ERROR, "message": span.error or span.status}
+            ),
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+    async def export(self, spans: List[Span]) -> None:
+        payload = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": self.service_name}},
+                    ],
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "decisionllm"},
+                    "spans": [self._encode(span) for span in spans],
+                }],
+            }],
+        }
+        response = await self._client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class Tracer:
+    """Creates spans and exports finished ones in the background.
+
+    Whether a trace is recorded is decided once, at its root span, with
+    probability `sample_rate`; every span below an unsampled root is a
+    no-op. The active span is tracked in a context variable, so tasks
+    started inside a span inherit it as their parent. Finished spans are
+    exported in the background by a `BatchWriter`.
+    """
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter],
+        sample_rate: float = 1.0,
+        batch_size: int = 512,
+        flush_interval: float = 2.0,
+        max_queue: int = 10000,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._batches = BatchWriter(
+            lambda spans: self.exporter.export(spans),
+            "spans",
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_queue=max_queue,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None and self.sample_rate > 0
+
+    def start_span(self, name: str, parent: Optional[Any] = None, **attributes: Any):
+        """Start a span under `parent`, or under the current span if none is given.
+
+        The caller must `end()` it; prefer `span()` where a block fits.
+        """
+        if parent is None:
+            parent = _current_span.get()
+        if parent is not None:
+            if not parent.sampled:
+                return UNSAMPLED
+            return Span(self, name, parent.trace_id, parent.span_id, attributes)
+        if not self.enabled or random.random() >= self.sample_rate:
+            return UNSAMPLED
+        return Span(self, name, f"{random.getrandbits(128):032x}", None, attributes)
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Any] = None, **attributes: Any) -> Iterator[Any]:
+        """Run a block inside a new span that is current for the block."""
+        span = self.start_span(name, parent, **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def _finish(self, span: Span) -> None:
+        self._batches.add(span)
+
+    def start(self) -> None:
+        if self.enabled:
+            self._batches.start()
+
+    async def stop(self) -> None:
+        """Export what is queued, then stop the writer and close the exporter."""
+        if self.exporter is not None:
+            await self._batches.stop()
+            await self.exporter.close()
+
+    async def flush(self) -> None:
+        """Export every queued span now."""
+        await self._batches.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return self._batches.stats()
+
+
+def create_tracer() -> Tracer:
+    """Build the tracer configured in settings."""
+    exporter: Optional[SpanExporter] = None
+    if settings.tracing_exporter == "jsonl":
+        exporter = JSONLSpanExporter(settings.tracing_path)
+    elif settings.tracing_exporter == "otlp":
+        exporter = OTLPSpanExporter(
+            settings.tracing_otlp_endpoint,
+            service_name=settings.tracing_service_name,
+            headers=settings.tracing_otlp_headers,
+        )
+    return Tracer(
+        exporter,
+        sample_rate=settings.tracing_sample_rate,
+        batch_size=settings.tracing_batch_size,
+        flush_interval=settings.tracing_flush_interval,
+        max_queue=settings.tracing_queue_size,
+    )
+
+
+# Global tracer shared by all executions
+tracer = create_tracer()
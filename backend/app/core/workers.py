@@ -0,0 +1,58 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import asyncio
+import functools
+
+from app.config import settings
+
+
+class CPUWorkerPool:
+    """Bounded worker pool for CPU-bound work that would block the event loop.
+
+    Jobs smaller than `inline_threshold` run inline, where the hand-off to a
+    worker would cost more than the work itself.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        mode: str = "thread",
+        inline_threshold: int = 20000,
+    ):
+        self.max_workers = max_workers
+        self.mode = mode
+        self.inline_threshold = inline_threshold
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="cpu-worker"
+                )
+        return self._executor
+
+    async def run(self, size: int, func: Callable[..., Any], *args: Any) -> Any:
+        """Run `func(*args)`, offloading it when `size` exceeds the threshold."""
+        if self.max_workers <= 0 or size < self.inline_threshold:
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), functools.partial(func, *args)
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Pool for consensus scoring and theme extraction
+consensus_pool = CPUWorkerPool(
+    max_workers=settings.consensus_workers,
+    mode=settings.consensus_pool_mode,
+    inline_threshold=settings.consensus_inline_threshold,
+)
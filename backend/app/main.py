@@ -1,14 +1,41 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.api.routes import chat, pipeline, providers
-from app.api.websocket import router as ws_router
+from app.api.routes import chat, pipeline, providers, cache, metrics
+from app.api.websocket import router as ws_router, manager
+from app.providers import provider_registry
+from app.core.workers import consensus_pool
+from app.core.events import event_bus
+from app.core.jobs import job_manager
+from app.core.history import execution_history
+from app.core.tracing import tracer
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create pooled provider clients once for the whole process
+    provider_registry.startup()
+    event_bus.start(manager.broadcast)
+    job_manager.start()
+    execution_history.start()
+    tracer.start()
+    yield
+    await job_manager.stop()
+    await execution_history.stop()
+    await event_bus.stop()
+    await tracer.stop()
+    await provider_registry.shutdown()
+    consensus_pool.shutdown()
+
 
 app = FastAPI(
     title="DecisionLLM",
     description="Multi-Layer Consensus System for LLM responses",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS Middleware
@@ -24,7 +51,9 @@ app.add_middleware(
 app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
 app.include_router(pipeline.router, prefix="/api/pipeline", tags=["pipeline"])
 app.include_router(providers.router, prefix="/api/providers", tags=["providers"])
+app.include_router(cache.router, prefix="/api/cache", tags=["cache"])
 app.include_router(ws_router, prefix="/ws", tags=["websocket"])
+app.include_router(metrics.router, tags=["metrics"])
 
 
 @app.get("/")
@@ -1,16 +1,23 @@
-from app.models.message import Message, MessageRole, ChatRequest, ChatResponse
+from app.models.message import Message, MessageRole, ChatRequest, ChatResponse, BatchChatRequest
 from app.models.node import NodeConfig, NodeState, NodeStatus
 from app.models.pipeline import PipelineConfig, PipelineLayer, PipelineState
+from app.models.job import JobStatus, JobInfo
+from app.models.history import ExecutionRecord, HistoryPage
 
 __all__ = [
     "Message",
     "MessageRole",
     "ChatRequest",
     "ChatResponse",
+    "BatchChatRequest",
     "NodeConfig",
     "NodeState",
     "NodeStatus",
     "PipelineConfig",
     "PipelineLayer",
     "PipelineState",
+    "JobStatus",
+    "JobInfo",
+    "ExecutionRecord",
+    "HistoryPage",
 ]
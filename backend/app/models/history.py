@@ -0,0 +1,24 @@
+from typing import Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+from app.models.node import NodeState
+
+
+class ExecutionRecord(BaseModel):
+    execution_id: str
+    pipeline_id: str
+    conversation_id: Optional[str] = None
+    status: str
+    user_message: str
+    final_output: Optional[str] = None
+    consensus_score: Optional[float] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    recorded_at: datetime
+    node_states: Optional[list[NodeState]] = None  # Only included on request
+
+
+class HistoryPage(BaseModel):
+    items: list[ExecutionRecord]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` for the next page
@@ -0,0 +1,25 @@
+from enum import Enum
+from typing import Optional
+from pydantic import BaseModel
+from datetime import datetime
+
+from app.models.message import ChatResponse
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    ERROR = "error"
+    CANCELLED = "cancelled"
+
+
+class JobInfo(BaseModel):
+    execution_id: str
+    pipeline_id: str
+    status: JobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    error: Optional[str] = None
+    result: Optional[ChatResponse] = None
@@ -23,6 +23,19 @@ class ChatRequest(BaseModel):
     message: str
     pipeline_id: Optional[str] = None
     conversation_id: Optional[str] = None
+    stream: bool = False  # Stream final-node tokens as server-sent events
+    # Overall time budget in seconds; partial results are returned when hit
+    deadline: Optional[float] = Field(default=None, gt=0)
+
+
+class BatchChatRequest(BaseModel):
+    messages: list[str] = Field(min_length=1)
+    pipeline_id: Optional[str] = None
+    concurrency: Optional[int] = Field(default=None, ge=1)
+    # Max concurrent calls per provider across the batch, e.g. {"openai": 8}
+    provider_concurrency: Optional[dict[str, int]] = None
+    publish_events: bool = False
+    deadline: Optional[float] = Field(default=None, gt=0)  # Per message, in seconds
 
 
 class ChatResponse(BaseModel):
@@ -30,4 +43,7 @@ class ChatResponse(BaseModel):
     message: Message
     pipeline_execution_id: str
     consensus_score: Optional[float] = None
+    common_themes: Optional[list[str]] = None
+    deadline_exceeded: bool = False  # Partial result returned at the deadline
+    usage: Optional[dict] = None  # Token, cost and latency totals for the run
     node_responses: Optional[list[dict]] = None
@@ -1,6 +1,6 @@
 from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 import uuid
 
@@ -10,6 +10,8 @@ class NodeStatus(str, Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     ERROR = "error"
+    CANCELLED = "cancelled"
+    SKIPPED = "skipped"
 
 
 class NodeRole(str, Enum):
@@ -18,6 +20,16 @@ class NodeRole(str, Enum):
     FINAL = "final"
 
 
+class HedgeConfig(BaseModel):
+    """Backup request issued when a node runs longer than expected.
+
+    Only applies to non-streamed calls; streamed nodes are never hedged.
+    """
+    provider: Optional[str] = None  # Defaults to the node's provider
+    model: Optional[str] = None  # Defaults to the node's model
+    delay: Optional[float] = None  # Seconds; defaults to the observed p95 latency
+
+
 class NodeConfig(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     provider: str  # openai, anthropic, google, mistral, local
@@ -26,6 +38,25 @@ class NodeConfig(BaseModel):
     temperature: float = 0.7
     max_tokens: int = 2048
     system_prompt: Optional[str] = None
+    # Upstream node ids feeding this node; None means the whole previous layer
+    inputs: Optional[list[str]] = None
+    hedge: Optional[HedgeConfig] = None
+    # Cache responses; None caches only deterministic calls (temperature 0)
+    cache: Optional[bool] = None
+    # Tried in order when the primary model fails, as "provider:model"
+    fallbacks: list[str] = []
+    max_retries: Optional[int] = Field(default=None, ge=0)  # Defaults to settings
+    # Seconds allowed per provider call; None uses settings.node_timeout
+    timeout: Optional[float] = Field(default=None, gt=0)
+
+    @field_validator("fallbacks")
+    @classmethod
+    def validate_fallbacks(cls, fallbacks: list[str]) -> list[str]:
+        for fallback in fallbacks:
+            provider, _, model = fallback.partition(":")
+            if not provider or not model:
+                raise ValueError(f"Fallback '{fallback}' must be 'provider:model'")
+        return fallbacks
 
 
 class NodeState(BaseModel):
@@ -36,13 +67,30 @@ class NodeState(BaseModel):
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     tokens_used: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    ttft: Optional[float] = None  # Seconds to first token of the successful call
+    latency: Optional[float] = None  # Seconds for the successful call
+    cost: Optional[float] = None  # Estimated USD; None if the model has no price
+    cached: bool = False
+    attempts: int = 0
+    served_by: Optional[str] = None  # "provider:model" that produced the output
 
 
 class NodeUpdateEvent(BaseModel):
     event: str = "node_update"
+    execution_id: Optional[str] = None
     node_id: str
     status: NodeStatus
     output: Optional[str] = None
     error: Optional[str] = None
     consensus_score: Optional[float] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class NodeDeltaEvent(BaseModel):
+    event: str = "node_delta"
+    execution_id: str
+    node_id: str
+    delta: str
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
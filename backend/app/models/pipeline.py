@@ -1,14 +1,23 @@
+from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 import uuid
 
 from app.models.node import NodeConfig, NodeState
 
 
+class StragglerPolicy(str, Enum):
+    CANCEL = "cancel"  # Cancel nodes still running once the quorum is met
+    BACKGROUND = "background"  # Let them finish after the execution returns
+
+
 class PipelineLayer(BaseModel):
     level: int
     nodes: list[NodeConfig]
+    # Downstream nodes proceed once this many nodes have completed
+    quorum: Optional[int] = Field(default=None, ge=1)
+    straggler_policy: StragglerPolicy = StragglerPolicy.CANCEL
 
 
 class PipelineConfig(BaseModel):
@@ -16,9 +25,25 @@ class PipelineConfig(BaseModel):
     name: str
     description: Optional[str] = None
     layers: list[PipelineLayer]
+    # Skip later layers when first-layer consensus reaches this score
+    early_exit_threshold: Optional[float] = Field(default=None, ge=0.0, le=1.0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @model_validator(mode="after")
+    def validate_node_inputs(self) -> "PipelineConfig":
+        """Explicit node inputs must reference nodes in earlier layers."""
+        earlier_ids: set[str] = set()
+        for layer in self.layers:
+            for node in layer.nodes:
+                for input_id in node.inputs or []:
+                    if input_id not in earlier_ids:
+                        raise ValueError(
+                            f"Node '{node.id}' input '{input_id}' is not a node in an earlier layer"
+                        )
+            earlier_ids.update(node.id for node in layer.nodes)
+        return self
+
     def get_total_nodes(self) -> int:
         return sum(len(layer.nodes) for layer in self.layers)
 
@@ -33,13 +58,24 @@ class PipelineConfig(BaseModel):
 class PipelineState(BaseModel):
     execution_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     pipeline_id: str
-    status: str = "pending"  # pending, running, completed, error
+    conversation_id: Optional[str] = None
+    status: str = "pending"  # pending, running, completed, partial, cancelled, error
     current_layer: int = 0
     node_states: dict[str, NodeState] = {}
     final_output: Optional[str] = None
     consensus_score: Optional[float] = None
+    common_themes: list[str] = []
+    layer_consensus: dict[int, float] = {}  # Updated as each node completes
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    cached_from: Optional[str] = None  # Execution id this result was served from
+    early_exit: bool = False  # Later layers skipped on first-layer consensus
+    skipped_layers: list[int] = []
+    deadline_exceeded: bool = False  # Unfinished nodes cancelled at the deadline
+    # Totals over nodes that called a provider (cached nodes cost nothing)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0  # Estimated USD over nodes with a known price
 
 
 class PipelineExecutionEvent(BaseModel):
@@ -1,12 +1,29 @@
 from typing import Dict, Type, Optional, List
+import logging
+
+import httpx
+
 from app.providers.base import BaseProvider
+from app.providers.recording import Recorder, RecordingProvider, ReplayStore, ReplayProvider
+from app.config import settings
+
+logger = logging.getLogger(__name__)
 
 
 class ProviderRegistry:
-    """Registry for LLM providers."""
+    """Registry for LLM providers.
+
+    Besides provider classes, the registry owns the process-wide pool of
+    provider instances so SDK clients and their connections are reused
+    across pipeline executions.
+    """
 
     def __init__(self):
         self._providers: Dict[str, Type[BaseProvider]] = {}
+        self._instances: Dict[str, BaseProvider] = {}
+        # Shared by all providers when recording or replaying
+        self._recorder: Optional[Recorder] = None
+        self._replay_store: Optional[ReplayStore] = None
 
     def register(self, name: str, provider_class: Type[BaseProvider]):
         """Register a provider class."""
@@ -20,6 +37,76 @@ class ProviderRegistry:
         """List all registered provider names."""
         return list(self._providers.keys())
 
+    def get_instance(self, name: str) -> Optional[BaseProvider]:
+        """Get the shared provider instance, creating it on first use.
+
+        In record mode the instance records every call it passes through;
+        in replay mode it serves recorded calls without creating the real
+        provider at all.
+        """
+        instance = self._instances.get(name)
+        if instance is None:
+            provider_class = self._providers.get(name)
+            if provider_class is None:
+                return None
+            if settings.provider_mode == "replay":
+                if self._replay_store is None:
+                    self._replay_store = ReplayStore(settings.recording_path, settings.replay_match)
+                instance = ReplayProvider(name, self._replay_store, settings.replay_speed)
+            else:
+                instance = provider_class(
+                    limits=self._pool_limits(name),
+                    http2=settings.provider_http2,
+                )
+                if settings.provider_mode == "record":
+                    if self._recorder is None:
+                        self._recorder = Recorder(
+                            settings.recording_path, settings.recording_include_messages
+                        )
+                    instance = RecordingProvider(name, instance, self._recorder)
+            self._instances[name] = instance
+        return instance
+
+    def _pool_limits(self, name: str) -> httpx.Limits:
+        """Build connection pool limits for a provider from settings."""
+        overrides = settings.provider_pool_limits.get(name, {})
+        return httpx.Limits(
+            max_connections=int(
+                overrides.get("max_connections", settings.provider_max_connections)
+            ),
+            max_keepalive_connections=int(
+                overrides.get(
+                    "max_keepalive_connections",
+                    settings.provider_max_keepalive_connections,
+                )
+            ),
+            keepalive_expiry=overrides.get(
+                "keepalive_expiry", settings.provider_keepalive_expiry
+            ),
+        )
+
+    def startup(self):
+        """Create provider instances up front so the first request is warm.
+
+        Providers that cannot be constructed (e.g. missing API key) are
+        skipped here and will raise when a node actually uses them.
+        """
+        for name in self._providers:
+            try:
+                self.get_instance(name)
+            except Exception as e:
+                logger.warning("Provider '%s' not initialized: %s", name, e)
+
+    async def shutdown(self):
+        """Close all pooled provider clients."""
+        instances = list(self._instances.items())
+        self._instances.clear()
+        for name, instance in instances:
+            try:
+                await instance.close()
+            except Exception as e:
+                logger.warning("Error closing provider '%s': %s", name, e)
+
 
 # Global registry
 provider_registry = ProviderRegistry()
@@ -30,9 +117,11 @@ from app.providers.anthropic import AnthropicProvider
 from app.providers.google import GoogleProvider
 from app.providers.mistral import MistralProvider
 from app.providers.local import LocalProvider
+from app.providers.simulated import SimulatedProvider
 
 provider_registry.register("openai", OpenAIProvider)
 provider_registry.register("anthropic", AnthropicProvider)
 provider_registry.register("google", GoogleProvider)
 provider_registry.register("mistral", MistralProvider)
 provider_registry.register("local", LocalProvider)
+provider_registry.register("simulated", SimulatedProvider)
@@ -1,15 +1,26 @@
-from typing import List, Dict, Any, AsyncIterator
+from typing import List, Dict, Any, AsyncIterator, Union
+import time
+
 import anthropic
 
-from app.providers.base import BaseProvider
+from app.providers.base import BaseProvider, GenerationResult
 from app.config import settings
 
 
 class AnthropicProvider(BaseProvider):
     """Anthropic Claude API provider."""
 
-    def __init__(self):
-        self.client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
+    transient_errors = (anthropic.APIConnectionError,)
+
+    def __init__(self, **pool_options: Any):
+        super().__init__(**pool_options)
+        self.client = anthropic.AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            http_client=self._create_http_client(client_class=anthropic.DefaultAsyncHttpxClient),
+        )
+
+    async def close(self) -> None:
+        await self.client.close()
 
     async def generate(
         self,
@@ -18,23 +29,26 @@ class AnthropicProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> str:
-        # Extract system message if present
-        system = None
+    ) -> GenerationResult:
+        started = time.perf_counter()
+
+        # Extract system messages if present
+        system_parts = []
         api_messages = []
 
         for msg in messages:
             if msg["role"] == "system":
-                system = msg["content"]
+                system_parts.append(msg["content"])
             else:
                 api_messages.append(msg)
 
         response = await self.client.messages.create(
             model=model,
             max_tokens=max_tokens,
-            system=system or "",
+            system="\n\n".join(system_parts),
             messages=api_messages,
             temperature=temperature,
+            timeout=kwargs.get("timeout", anthropic.NOT_GIVEN),
         )
 
         # Extract text from response
@@ -43,7 +57,14 @@ class AnthropicProvider(BaseProvider):
             if hasattr(block, "text"):
                 text_content += block.text
 
-        return text_content
+        return self._result(
+            model,
+            messages,
+            text_content,
+            started,
+            prompt_tokens=response.usage.input_tokens,
+            completion_tokens=response.usage.output_tokens,
+        )
 
     async def stream_generate(
         self,
@@ -52,26 +73,45 @@ class AnthropicProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> AsyncIterator[str]:
-        # Extract system message if present
-        system = None
+    ) -> AsyncIterator[Union[str, GenerationResult]]:
+        started = time.perf_counter()
+        first_token_at = None
+
+        # Extract system messages if present
+        system_parts = []
         api_messages = []
 
         for msg in messages:
             if msg["role"] == "system":
-                system = msg["content"]
+                system_parts.append(msg["content"])
             else:
                 api_messages.append(msg)
 
         async with self.client.messages.stream(
             model=model,
             max_tokens=max_tokens,
-            system=system or "",
+            system="\n\n".join(system_parts),
             messages=api_messages,
             temperature=temperature,
+            timeout=kwargs.get("timeout", anthropic.NOT_GIVEN),
         ) as stream:
             async for text in stream.text_stream:
+                first_token_at = first_token_at or time.perf_counter()
                 yield text
+            final = await stream.get_final_message()
+
+        text_content = "".join(
+            block.text for block in final.content if hasattr(block, "text")
+        )
+        yield self._result(
+            model,
+            messages,
+            text_content,
+            started,
+            prompt_tokens=final.usage.input_tokens,
+            completion_tokens=final.usage.output_tokens,
+            first_token_at=first_token_at,
+        )
 
     @classmethod
     def get_available_models(cls) -> List[Dict[str, str]]:
@@ -1,9 +1,130 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple, Type
+import asyncio
+import importlib.util
+import time
+
+import httpx
+
+from app.providers.pricing import estimate_cost
+from app.utils.tokens import estimate_tokens
+
+# Errors worth retrying whatever the provider; each provider adds the
+# connection and timeout errors its SDK wraps these in
+TRANSIENT_ERRORS: Tuple[Type[BaseException], ...] = (
+    asyncio.TimeoutError,
+    TimeoutError,
+    ConnectionError,
+    httpx.TransportError,
+)
+
+
+@dataclass
+class GenerationResult:
+    """Text and usage of one provider call."""
+
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    ttft: Optional[float] = None  # Seconds until the first token arrived
+    latency: float = 0.0  # Seconds for the whole call
+    cost: Optional[float] = None  # Estimated USD; None if the model has no price
 
 
 class BaseProvider(ABC):
-    """Abstract base class for LLM providers."""
+    """Abstract base class for LLM providers.
+
+    Provider instances are long-lived: the registry creates one per provider
+    at startup and shares it across executions, so each instance owns a
+    pooled HTTP client that must be released with `close()`.
+    """
+
+    # SDK errors for failed connections and timeouts, which are retried
+    transient_errors: Tuple[Type[BaseException], ...] = ()
+
+    def __init__(
+        self,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+    ):
+        self.limits = limits or httpx.Limits()
+        # HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+
+    def _create_http_client(
+        self,
+        timeout: float = 600.0,
+        client_class: Callable[..., Any] = httpx.AsyncClient,
+    ) -> Any:
+        """Create a pooled HTTP client using this provider's limits.
+
+        SDKs that only accept clients of their own HTTP library pass their
+        default client class (e.g. `anthropic.DefaultAsyncHttpxClient`).
+        """
+        return client_class(
+            limits=self.limits,
+            http2=self.http2,
+            timeout=timeout,
+        )
+
+    @staticmethod
+    async def _within_timeout(stream: AsyncIterator[Any], timeout: Optional[float]) -> AsyncIterator[Any]:
+        """Re-yield `stream`, raising asyncio.TimeoutError once `timeout` seconds pass.
+
+        For SDK streams that take no per-request timeout; the deadline covers
+        the whole stream, not each chunk.
+        """
+        if timeout is None:
+            async for item in stream:
+                yield item
+            return
+        deadline = time.monotonic() + timeout
+        iterator = stream.__aiter__()
+        while True:
+            try:
+                item = await asyncio.wait_for(
+                    iterator.__anext__(), max(0.0, deadline - time.monotonic())
+                )
+            except StopAsyncIteration:
+                return
+            yield item
+
+    async def close(self) -> None:
+        """Release pooled connections held by this provider."""
+        pass
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        """Estimated USD cost of a call; providers with other pricing override this."""
+        return estimate_cost(model, prompt_tokens, completion_tokens)
+
+    def _result(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        text: str,
+        started: float,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        first_token_at: Optional[float] = None,
+    ) -> GenerationResult:
+        """Build a call result, estimating token counts the API did not report.
+
+        `started` and `first_token_at` are `time.perf_counter()` readings.
+        """
+        finished = time.perf_counter()
+        if prompt_tokens is None:
+            prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        if completion_tokens is None:
+            completion_tokens = estimate_tokens(text)
+        return GenerationResult(
+            text=text,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            ttft=(first_token_at or finished) - started,
+            latency=finished - started,
+            cost=self.estimate_cost(model, prompt_tokens, completion_tokens),
+        )
 
     @abstractmethod
     async def generate(
@@ -13,7 +134,7 @@ class BaseProvider(ABC):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> str:
+    ) -> GenerationResult:
         """Generate a response from the LLM.
 
         Args:
@@ -21,10 +142,11 @@ class BaseProvider(ABC):
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature (0.0 - 2.0)
             max_tokens: Maximum tokens to generate
-            **kwargs: Additional provider-specific parameters
+            **kwargs: Additional provider-specific parameters; `timeout`
+                (seconds) bounds the request where the client supports it
 
         Returns:
-            The generated text response
+            The generated text with its token usage, timing and cost
         """
         pass
 
@@ -44,10 +166,12 @@ class BaseProvider(ABC):
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature (0.0 - 2.0)
             max_tokens: Maximum tokens to generate
-            **kwargs: Additional provider-specific parameters
+            **kwargs: Additional provider-specific parameters; `timeout`
+                (seconds) bounds the whole stream
 
         Yields:
-            Chunks of the generated text response
+            Chunks of the generated text response, then a GenerationResult
+            for the whole call as the last item
         """
         pass
 
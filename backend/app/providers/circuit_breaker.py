@@ -0,0 +1,83 @@
+from enum import Enum
+from typing import Dict, Optional
+import time
+
+from app.config import settings
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops calls to a provider after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are refused for `reset_timeout` seconds; then it half-opens and
+    lets calls through until one succeeds (close) or fails (re-open).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._state = CircuitState.CLOSED
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        return self.state != CircuitState.OPEN
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._state = CircuitState.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    """One circuit breaker per provider, created on first use."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, provider: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            breaker = self._breakers[provider] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout
+            )
+        return breaker
+
+    def find(self, provider: str) -> Optional[CircuitBreaker]:
+        """The provider's breaker if it has been called, without creating one."""
+        return self._breakers.get(provider)
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {
+            provider: {"state": breaker.state.value, "failures": breaker.failures}
+            for provider, breaker in self._breakers.items()
+        }
+
+
+# Global breakers shared by all executions
+circuit_breakers = CircuitBreakerRegistry(
+    failure_threshold=settings.circuit_failure_threshold,
+    reset_timeout=settings.circuit_reset_timeout,
+)
@@ -1,14 +1,17 @@
-from typing import List, Dict, Any, AsyncIterator
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple, Union
+import time
+
 import google.generativeai as genai
 
-from app.providers.base import BaseProvider
+from app.providers.base import BaseProvider, GenerationResult
 from app.config import settings
 
 
 class GoogleProvider(BaseProvider):
     """Google AI (Gemini) provider."""
 
-    def __init__(self):
+    def __init__(self, **pool_options: Any):
+        super().__init__(**pool_options)
         genai.configure(api_key=settings.google_api_key)
 
     async def generate(
@@ -18,7 +21,9 @@ class GoogleProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> str:
+    ) -> GenerationResult:
+        started = time.perf_counter()
+
         # Convert messages to Gemini format
         gemini_model = genai.GenerativeModel(model)
 
@@ -29,7 +34,7 @@ class GoogleProvider(BaseProvider):
 
         for msg in messages:
             if msg["role"] == "system":
-                system_prompt = msg["content"]
+                system_prompt = "\n\n".join(filter(None, [system_prompt, msg["content"]]))
             elif msg["role"] == "user":
                 current_message = msg["content"]
                 if system_prompt:
@@ -50,9 +55,18 @@ class GoogleProvider(BaseProvider):
         response = await chat.send_message_async(
             current_message or messages[-1]["content"],
             generation_config=generation_config,
+            request_options=self._request_options(kwargs),
         )
 
-        return response.text
+        prompt_tokens, completion_tokens = self._usage(response)
+        return self._result(
+            model,
+            messages,
+            response.text,
+            started,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
 
     async def stream_generate(
         self,
@@ -61,7 +75,10 @@ class GoogleProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> AsyncIterator[str]:
+    ) -> AsyncIterator[Union[str, GenerationResult]]:
+        started = time.perf_counter()
+        first_token_at = None
+        chunks = []
         gemini_model = genai.GenerativeModel(model)
 
         # Build the prompt from messages
@@ -85,12 +102,40 @@ class GoogleProvider(BaseProvider):
             prompt,
             generation_config=generation_config,
             stream=True,
+            request_options=self._request_options(kwargs),
         )
 
         async for chunk in response:
             if chunk.text:
+                first_token_at = first_token_at or time.perf_counter()
+                chunks.append(chunk.text)
                 yield chunk.text
 
+        prompt_tokens, completion_tokens = self._usage(response)
+        yield self._result(
+            model,
+            messages,
+            "".join(chunks),
+            started,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            first_token_at=first_token_at,
+        )
+
+    @staticmethod
+    def _usage(response: Any) -> Tuple[Optional[int], Optional[int]]:
+        """Token counts from a response, if this SDK version reports them."""
+        usage = getattr(response, "usage_metadata", None)
+        if not usage:
+            return None, None
+        return usage.prompt_token_count, usage.candidates_token_count
+
+    @staticmethod
+    def _request_options(kwargs: Dict[str, Any]) -> Optional[Dict[str, float]]:
+        """Per-request options carrying the call's `timeout`, if any."""
+        timeout = kwargs.get("timeout")
+        return {"timeout": timeout} if timeout is not None else None
+
     @classmethod
     def get_available_models(cls) -> List[Dict[str, str]]:
         return [
@@ -1,15 +1,27 @@
-from typing import List, Dict, Any, AsyncIterator
+from typing import List, Dict, Any, AsyncIterator, Optional, Union
+import json
+import time
+
 import httpx
 
-from app.providers.base import BaseProvider
+from app.providers.base import BaseProvider, GenerationResult
 from app.config import settings
 
 
 class LocalProvider(BaseProvider):
     """Local LLM provider using Ollama API."""
 
-    def __init__(self):
+    def __init__(self, **pool_options: Any):
+        super().__init__(**pool_options)
         self.base_url = settings.ollama_base_url
+        self.client = self._create_http_client(timeout=settings.ollama_timeout)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        # Self-hosted models have no per-token price
+        return 0.0
 
     async def generate(
         self,
@@ -18,24 +30,31 @@ class LocalProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> str:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens,
-                    },
-                    "stream": False,
+    ) -> GenerationResult:
+        started = time.perf_counter()
+        response = await self.client.post(
+            f"{self.base_url}/api/chat",
+            json={
+                "model": model,
+                "messages": messages,
+                "options": {
+                    "temperature": temperature,
+                    "num_predict": max_tokens,
                 },
-                timeout=120.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("message", {}).get("content", "")
+                "stream": False,
+            },
+            timeout=kwargs.get("timeout", httpx.USE_CLIENT_DEFAULT),
+        )
+        response.raise_for_status()
+        data = response.json()
+        return self._result(
+            model,
+            messages,
+            data.get("message", {}).get("content", ""),
+            started,
+            prompt_tokens=data.get("prompt_eval_count"),
+            completion_tokens=data.get("eval_count"),
+        )
 
     async def stream_generate(
         self,
@@ -44,33 +63,50 @@ class LocalProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> AsyncIterator[str]:
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens,
-                    },
-                    "stream": True,
+    ) -> AsyncIterator[Union[str, GenerationResult]]:
+        started = time.perf_counter()
+        first_token_at = None
+        chunks = []
+        final: Dict[str, Any] = {}
+        async with self.client.stream(
+            "POST",
+            f"{self.base_url}/api/chat",
+            json={
+                "model": model,
+                "messages": messages,
+                "options": {
+                    "temperature": temperature,
+                    "num_predict": max_tokens,
                 },
-                timeout=120.0,
-            ) as response:
-                response.raise_for_status()
-                async for line in response.aiter_lines():
-                    if line:
-                        import json
-                        try:
-                            data = json.loads(line)
-                            content = data.get("message", {}).get("content", "")
-                            if content:
-                                yield content
-                        except json.JSONDecodeError:
-                            continue
+                "stream": True,
+            },
+            timeout=kwargs.get("timeout", httpx.USE_CLIENT_DEFAULT),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line:
+                    try:
+                        data = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    content = data.get("message", {}).get("content", "")
+                    if content:
+                        first_token_at = first_token_at or time.perf_counter()
+                        chunks.append(content)
+                        yield content
+                    if data.get("done"):
+                        # The last line carries the token counts
+                        final = data
+
+        yield self._result(
+            model,
+            messages,
+            "".join(chunks),
+            started,
+            prompt_tokens=final.get("prompt_eval_count"),
+            completion_tokens=final.get("eval_count"),
+            first_token_at=first_token_at,
+        )
 
     @classmethod
     def get_available_models(cls) -> List[Dict[str, str]]:
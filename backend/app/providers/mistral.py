@@ -1,16 +1,31 @@
-from typing import List, Dict, Any, AsyncIterator
+from typing import List, Dict, Any, AsyncIterator, Union
+import asyncio
+import time
+
 from mistralai.async_client import MistralAsyncClient
+from mistralai.exceptions import MistralConnectionException
 from mistralai.models.chat_completion import ChatMessage
 
-from app.providers.base import BaseProvider
+from app.providers.base import BaseProvider, GenerationResult
 from app.config import settings
 
 
 class MistralProvider(BaseProvider):
     """Mistral AI provider."""
 
-    def __init__(self):
-        self.client = MistralAsyncClient(api_key=settings.mistral_api_key)
+    transient_errors = (MistralConnectionException,)
+
+    def __init__(self, **pool_options: Any):
+        super().__init__(**pool_options)
+        # The Mistral client manages its own httpx pool (HTTP/2 enabled);
+        # only the connection cap is configurable.
+        self.client = MistralAsyncClient(
+            api_key=settings.mistral_api_key,
+            max_concurrent_requests=self.limits.max_connections or 64,
+        )
+
+    async def close(self) -> None:
+        await self.client.close()
 
     async def generate(
         self,
@@ -19,21 +34,34 @@ class MistralProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> str:
+    ) -> GenerationResult:
+        started = time.perf_counter()
+
         # Convert to Mistral message format
         mistral_messages = [
             ChatMessage(role=msg["role"], content=msg["content"])
             for msg in messages
         ]
 
-        response = await self.client.chat(
-            model=model,
-            messages=mistral_messages,
-            temperature=temperature,
-            max_tokens=max_tokens,
+        # The client only takes a timeout at construction; bound this call here
+        response = await asyncio.wait_for(
+            self.client.chat(
+                model=model,
+                messages=mistral_messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            ),
+            kwargs.get("timeout"),
         )
 
-        return response.choices[0].message.content
+        return self._result(
+            model,
+            messages,
+            response.choices[0].message.content,
+            started,
+            prompt_tokens=response.usage.prompt_tokens if response.usage else None,
+            completion_tokens=response.usage.completion_tokens if response.usage else None,
+        )
 
     async def stream_generate(
         self,
@@ -42,22 +70,43 @@ class MistralProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> AsyncIterator[str]:
+    ) -> AsyncIterator[Union[str, GenerationResult]]:
+        started = time.perf_counter()
+        first_token_at = None
+        chunks = []
+        usage = None
+
         # Convert to Mistral message format
         mistral_messages = [
             ChatMessage(role=msg["role"], content=msg["content"])
             for msg in messages
         ]
 
-        async for chunk in self.client.chat_stream(
+        stream = self.client.chat_stream(
             model=model,
             messages=mistral_messages,
             temperature=temperature,
             max_tokens=max_tokens,
-        ):
-            if chunk.choices[0].delta.content:
+        )
+        async for chunk in self._within_timeout(stream, kwargs.get("timeout")):
+            # The final chunk carries usage for the whole response
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                first_token_at = first_token_at or time.perf_counter()
+                chunks.append(chunk.choices[0].delta.content)
                 yield chunk.choices[0].delta.content
 
+        yield self._result(
+            model,
+            messages,
+            "".join(chunks),
+            started,
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            first_token_at=first_token_at,
+        )
+
     @classmethod
     def get_available_models(cls) -> List[Dict[str, str]]:
         return [
@@ -1,15 +1,26 @@
-from typing import List, Dict, Any, AsyncIterator
-from openai import AsyncOpenAI
+from typing import List, Dict, Any, AsyncIterator, Union
+import time
 
-from app.providers.base import BaseProvider
+from openai import APIConnectionError, AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.providers.base import BaseProvider, GenerationResult
 from app.config import settings
 
 
 class OpenAIProvider(BaseProvider):
     """OpenAI API provider."""
 
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key)
+    transient_errors = (APIConnectionError,)
+
+    def __init__(self, **pool_options: Any):
+        super().__init__(**pool_options)
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=self._create_http_client(client_class=DefaultAsyncHttpxClient),
+        )
+
+    async def close(self) -> None:
+        await self.client.close()
 
     async def generate(
         self,
@@ -18,7 +29,8 @@ class OpenAIProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> str:
+    ) -> GenerationResult:
+        started = time.perf_counter()
         response = await self.client.chat.completions.create(
             model=model,
             messages=messages,
@@ -26,7 +38,15 @@ class OpenAIProvider(BaseProvider):
             max_tokens=max_tokens,
             **kwargs,
         )
-        return response.choices[0].message.content or ""
+        usage = response.usage
+        return self._result(
+            model,
+            messages,
+            response.choices[0].message.content or "",
+            started,
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+        )
 
     async def stream_generate(
         self,
@@ -35,19 +55,39 @@ class OpenAIProvider(BaseProvider):
         temperature: float = 0.7,
         max_tokens: int = 2048,
         **kwargs: Any,
-    ) -> AsyncIterator[str]:
+    ) -> AsyncIterator[Union[str, GenerationResult]]:
+        started = time.perf_counter()
+        first_token_at = None
+        chunks = []
+        usage = None
         stream = await self.client.chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
             stream=True,
+            stream_options={"include_usage": True},
             **kwargs,
         )
         async for chunk in stream:
-            if chunk.choices[0].delta.content:
+            # The usage chunk comes last and has no choices
+            if chunk.usage:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                first_token_at = first_token_at or time.perf_counter()
+                chunks.append(chunk.choices[0].delta.content)
                 yield chunk.choices[0].delta.content
 
+        yield self._result(
+            model,
+            messages,
+            "".join(chunks),
+            started,
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            completion_tokens=usage.completion_tokens if usage else None,
+            first_token_at=first_token_at,
+        )
+
     @classmethod
     def get_available_models(cls) -> List[Dict[str, str]]:
         return [
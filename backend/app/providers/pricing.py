@@ -0,0 +1,48 @@
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+
+# USD per million (input, output) tokens, from the providers' list prices.
+# Override or extend with the MODEL_PRICES setting.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    # OpenAI
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    # Anthropic
+    "claude-sonnet-4-20250514": (3.00, 15.00),
+    "claude-3-5-sonnet-20241022": (3.00, 15.00),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-3-opus-20240229": (15.00, 75.00),
+    "claude-3-sonnet-20240229": (3.00, 15.00),
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    # Google
+    "gemini-2.0-flash-exp": (0.10, 0.40),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.0-pro": (0.50, 1.50),
+    # Mistral
+    "mistral-large-latest": (2.00, 6.00),
+    "mistral-medium-latest": (0.40, 2.00),
+    "mistral-small-latest": (0.10, 0.30),
+    "open-mixtral-8x22b": (2.00, 6.00),
+    "open-mixtral-8x7b": (0.70, 0.70),
+}
+
+
+def model_price(model: str) -> Optional[Tuple[float, float]]:
+    """(input, output) USD per million tokens for a model, if known."""
+    override = settings.model_prices.get(model)
+    if override is not None:
+        return override.get("input", 0.0), override.get("output", 0.0)
+    return MODEL_PRICES.get(model)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Estimated USD cost of a call, or None for models without a price."""
+    price = model_price(model)
+    if price is None:
+        return None
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
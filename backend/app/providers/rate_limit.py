@@ -0,0 +1,157 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+import asyncio
+import time
+
+from app.utils.tokens import estimate_tokens
+from app.config import settings
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `per_minute` tokens/min.
+
+    Waiters are served in arrival order; a request larger than the bucket
+    waits for a full bucket instead of failing.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+    def adjust(self, amount: float) -> None:
+        """Charge `amount` more tokens, or refund them if negative.
+
+        Charges apply immediately and may leave the bucket in debt, which
+        later callers wait off; refunds are capped at the capacity.
+        """
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class TokenReservation:
+    """Tokens charged up front for one call, corrected once its usage is known."""
+
+    def __init__(self, reserved: int):
+        self.reserved = reserved
+        self._buckets: List[TokenBucket] = []
+        self._settled = False
+
+    def settle(self, used: int) -> None:
+        """Charge or refund the difference between the estimate and `used`."""
+        if self._settled:
+            return
+        self._settled = True
+        for bucket in self._buckets:
+            bucket.adjust(used - self.reserved)
+
+
+class _Scope:
+    """Limits and wait statistics for one provider or provider:model key."""
+
+    def __init__(self, limits: Dict[str, float]):
+        requests = limits.get("requests_per_minute")
+        tokens = limits.get("tokens_per_minute")
+        concurrency = limits.get("max_concurrency")
+        self.requests = TokenBucket(requests) if requests else None
+        self.tokens = TokenBucket(tokens) if tokens else None
+        self.concurrency = asyncio.Semaphore(int(concurrency)) if concurrency else None
+
+        self.calls = 0
+        self.waited_calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.in_flight = 0
+
+    def record_wait(self, seconds: float) -> None:
+        self.calls += 1
+        if seconds > 0.001:
+            self.waited_calls += 1
+        self.total_wait += seconds
+        self.max_wait = max(self.max_wait, seconds)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "calls": self.calls,
+            "waited_calls": self.waited_calls,
+            "total_wait_seconds": self.total_wait,
+            "max_wait_seconds": self.max_wait,
+            "avg_wait_seconds": self.total_wait / self.calls if self.calls else 0.0,
+            "in_flight": self.in_flight,
+        }
+
+
+class ProviderRateLimiter:
+    """Process-wide request, token and concurrency budgets per provider.
+
+    Limits are keyed by provider name (e.g. "openai") or by
+    "provider:model" (e.g. "openai:gpt-4"); a call must pass every scope
+    that applies to it. Calls over budget wait their turn instead of
+    failing with provider 429s. Token budgets are charged the estimate up
+    front and corrected when the caller settles the reservation with the
+    call's real usage.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, float]]):
+        self._scopes = {key: _Scope(value) for key, value in limits.items()}
+
+    @staticmethod
+    def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+        """Rough token cost of a call: prompt estimate plus output budget."""
+        return sum(estimate_tokens(message.get("content", "")) for message in messages) + max_tokens
+
+    @asynccontextmanager
+    async def limit(self, provider: str, model: str, tokens: int) -> AsyncIterator[TokenReservation]:
+        """Wait for budget in every applicable scope, then hold a concurrency slot.
+
+        Yields the token reservation; calls that do not settle it keep the
+        estimate charged.
+        """
+        scopes = [
+            scope for scope in (self._scopes.get(provider), self._scopes.get(f"{provider}:{model}"))
+            if scope is not None
+        ]
+        reservation = TokenReservation(tokens)
+        acquired: List[_Scope] = []
+        try:
+            for scope in scopes:
+                started = time.monotonic()
+                if scope.concurrency is not None:
+                    await scope.concurrency.acquire()
+                scope.in_flight += 1
+                acquired.append(scope)
+                if scope.requests is not None:
+                    await scope.requests.acquire(1)
+                if scope.tokens is not None:
+                    await scope.tokens.acquire(tokens)
+                    reservation._buckets.append(scope.tokens)
+                scope.record_wait(time.monotonic() - started)
+            yield reservation
+        finally:
+            for scope in acquired:
+                if scope.concurrency is not None:
+                    scope.concurrency.release()
+                scope.in_flight -= 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {key: scope.stats() for key, scope in self._scopes.items()}
+
+
+# Global limiter shared by all executions
+rate_limiter = ProviderRateLimiter(settings.provider_rate_limits)
@@ -0,0 +1,357 @@
+from collections import defaultdict
+from itertools import count, cycle
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Union
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import time
+
+from app.providers.base import TRANSIENT_ERRORS, BaseProvider, GenerationResult
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+def request_key(
+    provider: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """Identify a request by everything that determines its response."""
+    payload = json.dumps(
+        [provider, model, messages, temperature, max_tokens],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _open(path: str, mode: str):
+    """Open a recording as text, gzip-compressed if the name ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class ReplayedProviderError(Exception):
+    """A recorded provider failure; carries its HTTP status like the SDK errors."""
+
+    def __init__(self, status_code: Optional[int], message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ReplayedTransientError(ReplayedProviderError, ConnectionError):
+    """A recorded timeout or connection failure, retried like the original."""
+
+
+class Recorder:
+    """Appends recorded provider calls to a JSONL file, one call per line.
+
+    A line holds the request key, provider and model, the response text or
+    its stream chunks as `[milliseconds since the call started, text]`
+    pairs, token usage, cost and timing, or the error the call raised.
+    Prompts are stored only with `include_messages`.
+    """
+
+    def __init__(self, path: str, include_messages: bool = False):
+        self.path = path
+        self.include_messages = include_messages
+        self._file = None
+        self.sequence = count()
+        self.recorded = 0
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._file is None:
+            self._file = _open(self.path, "a")
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        # Calls are seconds apart; flushing each keeps a crash from losing them
+        self._file.flush()
+        self.recorded += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class RecordingProvider(BaseProvider):
+    """Passes calls through to a real provider and records each one."""
+
+    def __init__(self, name: str, provider: BaseProvider, recorder: Recorder):
+        super().__init__()
+        self.name = name
+        self.provider = provider
+        self.recorder = recorder
+
+    async def close(self) -> None:
+        await self.provider.close()
+        self.recorder.close()
+
+    def _begin(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+    ) -> Dict[str, Any]:
+        """Start the record of a call; taken before it is sent."""
+        record: Dict[str, Any] = {
+            "v": FORMAT_VERSION,
+            "key": request_key(self.name, model, messages, temperature, max_tokens),
+            "provider": self.name,
+            "model": model,
+            "at": round(time.time(), 3),
+            # Orders identical requests on replay
+            "seq": next(self.recorder.sequence),
+        }
+        if self.recorder.include_messages:
+            record.update(messages=messages, temperature=temperature, max_tokens=max_tokens)
+        return record
+
+    def _finish(
+        self,
+        record: Dict[str, Any],
+        started: float,
+        result: Optional[GenerationResult] = None,
+        chunks: Optional[List[List[Union[int, str]]]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        if error is not None:
+            record["error"] = {
+                "status": getattr(error, "status_code", None),
+                "message": str(error),
+                "after_ms": round((time.perf_counter() - started) * 1000),
+            }
+            if isinstance(error, TRANSIENT_ERRORS + self.provider.transient_errors):
+                record["error"]["transient"] = True
+        else:
+            if chunks is not None:
+                record["chunks"] = chunks
+            else:
+                record["text"] = result.text
+            record.update(
+                prompt_tokens=result.prompt_tokens,
+                completion_tokens=result.completion_tokens,
+                ttft_ms=round(result.ttft * 1000) if result.ttft is not None else None,
+                latency_ms=round(result.latency * 1000),
+                cost=result.cost,
+            )
+        self.recorder.write(record)
+
+    async def generate(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        **kwargs: Any,
+    ) -> GenerationResult:
+        record = self._begin(model, messages, temperature, max_tokens)
+        started = time.perf_counter()
+        try:
+            result = await self.provider.generate(model, messages, temperature, max_tokens, **kwargs)
+        except Exception as e:
+            self._finish(record, started, error=e)
+            raise
+        self._finish(record, started, result=result)
+        return result
+
+    async def stream_generate(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        **kwargs: Any,
+    ) -> AsyncIterator[Union[str, GenerationResult]]:
+        record = self._begin(model, messages, temperature, max_tokens)
+        started = time.perf_counter()
+        chunks: List[List[Union[int, str]]] = []
+        stream = self.provider.stream_generate(model, messages, temperature, max_tokens, **kwargs)
+        try:
+            async for item in stream:
+                if isinstance(item, GenerationResult):
+                    self._finish(record, started, result=item, chunks=chunks)
+                else:
+                    chunks.append([round((time.perf_counter() - started) * 1000), item])
+                yield item
+        except Exception as e:
+            self._finish(record, started, error=e)
+            raise
+        finally:
+            # A stream the caller abandons has no result and is not recorded
+            await stream.aclose()
+
+    @classmethod
+    def get_available_models(cls) -> List[Dict[str, str]]:
+        return []
+
+
+class ReplayStore:
+    """Recorded calls loaded from a file, looked up by request or by model.
+
+    Calls with the same key are served in the order they started, starting over
+    when exhausted. With `match="model"` a request without an exact match
+    gets the next recorded call of the same provider and model, so traffic
+    recorded with other prompts can still be replayed.
+    """
+
+    def __init__(self, path: str, match: str = "exact"):
+        self.path = path
+        self.match = match
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._by_model: Dict[tuple, List[Dict[str, Any]]] = defaultdict(list)
+        self._key_cursors: Dict[str, Iterator[Dict[str, Any]]] = {}
+        self._model_cursors: Dict[tuple, Iterator[Dict[str, Any]]] = {}
+        self.served = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        with _open(self.path, "r") as f:
+            try:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Last line of a recording that was not closed cleanly
+                        logger.warning("Skipping a truncated record in %s", self.path)
+                        continue
+                    self._by_key[record["key"]].append(record)
+                    self._by_model[(record["provider"], record["model"])].append(record)
+            except EOFError:
+                # Compressed recording whose writer never closed it
+                logger.warning("Recording %s ends early; using the calls read so far", self.path)
+        # Records are written as calls finish; serve them in the order they started
+        for records in (*self._by_key.values(), *self._by_model.values()):
+            records.sort(key=lambda record: (record["at"], record["seq"]))
+        logger.info("Loaded %d recorded calls from %s", len(self), self.path)
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._by_key.values())
+
+    def next(self, provider: str, model: str, key: str) -> Dict[str, Any]:
+        if key in self._by_key:
+            cursor = self._key_cursors.setdefault(key, cycle(self._by_key[key]))
+        elif self.match == "model" and (provider, model) in self._by_model:
+            cursor = self._model_cursors.setdefault(
+                (provider, model), cycle(self._by_model[(provider, model)])
+            )
+        else:
+            self.misses += 1
+            raise ValueError(f"No recorded call for {provider}:{model} matches the request")
+        self.served += 1
+        return next(cursor)
+
+
+class ReplayProvider(BaseProvider):
+    """Serves recorded calls offline, with the recorded or scaled timing.
+
+    `speed` divides every recorded delay: 2.0 replays twice as fast and 0
+    returns immediately. Recorded failures are raised again.
+    """
+
+    def __init__(self, name: str, store: ReplayStore, speed: float = 1.0):
+        super().__init__()
+        self.name = name
+        self.store = store
+        self.speed = speed
+
+    async def _wait_until(self, started: float, offset_ms: Optional[float]) -> None:
+        """Sleep until `offset_ms` of recorded time after `started`, scaled."""
+        if not self.speed or not offset_ms:
+            return
+        delay = started + offset_ms / 1000 / self.speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _lookup(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+    ) -> Dict[str, Any]:
+        key = request_key(self.name, model, messages, temperature, max_tokens)
+        return self.store.next(self.name, model, key)
+
+    async def _raise_error(self, record: Dict[str, Any], started: float) -> None:
+        error = record["error"]
+        await self._wait_until(started, error["after_ms"])
+        error_class = ReplayedTransientError if error.get("transient") else ReplayedProviderError
+        raise error_class(error["status"], error["message"])
+
+    def _replayed_result(
+        self, record: Dict[str, Any], text: str, started: float, first_token_at: Optional[float]
+    ) -> GenerationResult:
+        finished = time.perf_counter()
+        return GenerationResult(
+            text=text,
+            prompt_tokens=record["prompt_tokens"],
+            completion_tokens=record["completion_tokens"],
+            ttft=(first_token_at or finished) - started,
+            latency=finished - started,
+            cost=record["cost"],
+        )
+
+    async def generate(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        **kwargs: Any,
+    ) -> GenerationResult:
+        started = time.perf_counter()
+        record = self._lookup(model, messages, temperature, max_tokens)
+        if "error" in record:
+            await self._raise_error(record, started)
+
+        text = record["text"] if "text" in record else "".join(chunk for _, chunk in record["chunks"])
+        await self._wait_until(started, record["latency_ms"])
+        first_token_at = None
+        if record["ttft_ms"] is not None and self.speed:
+            first_token_at = started + record["ttft_ms"] / 1000 / self.speed
+        return self._replayed_result(record, text, started, first_token_at)
+
+    async def stream_generate(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        **kwargs: Any,
+    ) -> AsyncIterator[Union[str, GenerationResult]]:
+        started = time.perf_counter()
+        record = self._lookup(model, messages, temperature, max_tokens)
+        if "error" in record:
+            await self._raise_error(record, started)
+
+        # Calls recorded without streaming arrive as one chunk at their TTFT
+        if "chunks" in record:
+            chunks = record["chunks"]
+        else:
+            chunks = [[record["ttft_ms"] or record["latency_ms"], record["text"]]]
+        first_token_at = None
+        for offset_ms, chunk in chunks:
+            await self._wait_until(started, offset_ms)
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            yield chunk
+
+        await self._wait_until(started, record["latency_ms"])
+        yield self._replayed_result(
+            record, "".join(chunk for _, chunk in chunks), started, first_token_at
+        )
+
+    @classmethod
+    def get_available_models(cls) -> List[Dict[str, str]]:
+        return []
@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from typing import List, Dict, Any, AsyncIterator, Optional, Union
+import asyncio
+import math
+import random
+import time
+
+from app.providers.base import BaseProvider, GenerationResult
+from app.config import settings
+
+# Words the simulated models answer with; a small vocabulary keeps outputs
+# of different nodes overlapping, as real answers to one question do
+VOCABULARY = (
+    "the model answer should consider cost latency risk quality users data "
+    "system option first second because however therefore which likely best "
+    "trade off approach result evidence suggests support recommend choose"
+).split()
+
+
+class SimulatedProviderError(Exception):
+    """Injected provider failure; carries an HTTP status like the SDK errors."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class SimulationProfile:
+    """Timing, length and failure behaviour of one simulated model."""
+
+    ttft: float = 0.4  # Median seconds until the first token
+    ttft_sigma: float = 0.3  # Log-normal spread of the TTFT; 0 makes it fixed
+    tokens_per_second: float = 60.0
+    output_tokens: int = 150  # Mean output length, capped by max_tokens
+    output_tokens_stddev: float = 40.0
+    error_rate: float = 0.0  # Probability that a call fails after its TTFT
+    error_status: int = 503
+    chunk_tokens: int = 1  # Tokens per streamed chunk
+
+
+class SimulatedProvider(BaseProvider):
+    """Offline provider that emits random tokens with configurable timing.
+
+    Used by the benchmarks to load the executor, consensus and event
+    delivery without network access or API spend. Each model follows its
+    profile from `SIMULATED_PROFILES` (or `set_profile()`); unknown models
+    use the default profile.
+    """
+
+    def __init__(self, seed: Optional[int] = None, **pool_options: Any):
+        super().__init__(**pool_options)
+        self.profiles: Dict[str, SimulationProfile] = {
+            model: SimulationProfile(**profile)
+            for model, profile in settings.simulated_profiles.items()
+        }
+        self.default_profile = SimulationProfile()
+        self._random = random.Random(seed)
+
+    def set_profile(self, model: str, profile: SimulationProfile) -> None:
+        self.profiles[model] = profile
+
+    def profile(self, model: str) -> SimulationProfile:
+        return self.profiles.get(model, self.default_profile)
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        return 0.0
+
+    def _plan(self, model: str, max_tokens: int):
+        """Draw the TTFT, output length and outcome of one call."""
+        profile = self.profile(model)
+        ttft = profile.ttft
+        if profile.ttft_sigma > 0:
+            ttft = self._random.lognormvariate(math.log(profile.ttft), profile.ttft_sigma)
+        length = round(self._random.gauss(profile.output_tokens, profile.output_tokens_stddev))
+        length = max(1, min(length, max_tokens))
+        fails = self._random.random() < profile.error_rate
+        return profile, ttft, length, fails
+
+    def _tokens(self, count: int) -> List[str]:
+        return [self._random.choice(VOCABULARY) for _ in range(count)]
+
+    @staticmethod
+    async def _wait(seconds: float, deadline: Optional[float]) -> None:
+        """Sleep through part of a call, timing out at `deadline` like an HTTP client."""
+        if deadline is not None and time.perf_counter() + seconds > deadline:
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+            raise asyncio.TimeoutError
+        await asyncio.sleep(seconds)
+
+    @staticmethod
+    def _deadline(started: float, kwargs: Dict[str, Any]) -> Optional[float]:
+        timeout = kwargs.get("timeout")
+        return started + timeout if timeout is not None else None
+
+    async def generate(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        **kwargs: Any,
+    ) -> GenerationResult:
+        started = time.perf_counter()
+        deadline = self._deadline(started, kwargs)
+        profile, ttft, length, fails = self._plan(model, max_tokens)
+        if fails:
+            await self._wait(ttft, deadline)
+            raise SimulatedProviderError(profile.error_status, f"Simulated failure of '{model}'")
+
+        await self._wait(ttft + length / profile.tokens_per_second, deadline)
+        return self._result(
+            model,
+            messages,
+            " ".join(self._tokens(length)),
+            started,
+            completion_tokens=length,
+            first_token_at=started + ttft,
+        )
+
+    async def stream_generate(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        **kwargs: Any,
+    ) -> AsyncIterator[Union[str, GenerationResult]]:
+        started = time.perf_counter()
+        deadline = self._deadline(started, kwargs)
+        profile, ttft, length, fails = self._plan(model, max_tokens)
+        await self._wait(ttft, deadline)
+        if fails:
+            raise SimulatedProviderError(profile.error_status, f"Simulated failure of '{model}'")
+
+        first_token_at = time.perf_counter()
+        tokens = self._tokens(length)
+        chunk_size = max(1, profile.chunk_tokens)
+        for index in range(0, length, chunk_size):
+            if index:
+                await self._wait(chunk_size / profile.tokens_per_second, deadline)
+            chunk = " ".join(tokens[index:index + chunk_size])
+            yield chunk if not index else " " + chunk
+
+        yield self._result(
+            model,
+            messages,
+            " ".join(tokens),
+            started,
+            completion_tokens=length,
+            first_token_at=first_token_at,
+        )
+
+    @classmethod
+    def get_available_models(cls) -> List[Dict[str, str]]:
+        models = list(settings.simulated_profiles) or ["sim-default"]
+        return [{"id": model, "name": f"Simulated {model}"} for model in models]
@@ -1,21 +1,23 @@
 """Text similarity utilities."""
 
-from typing import List
+from typing import AbstractSet, FrozenSet, List
 import re
 
 
 def jaccard_similarity(text1: str, text2: str) -> float:
     """Calculate Jaccard similarity between two texts."""
-    words1 = set(tokenize(text1))
-    words2 = set(tokenize(text2))
+    return jaccard_token_sets(set(tokenize(text1)), set(tokenize(text2)))
 
+
+def jaccard_token_sets(words1: AbstractSet[str], words2: AbstractSet[str]) -> float:
+    """Calculate Jaccard similarity between two pre-tokenized word sets."""
     if not words1 or not words2:
         return 0.0
 
-    intersection = words1.intersection(words2)
-    union = words1.union(words2)
+    intersection = len(words1 & words2)
+    union = len(words1) + len(words2) - intersection
 
-    return len(intersection) / len(union) if union else 0.0
+    return intersection / union if union else 0.0
 
 
 def tokenize(text: str) -> List[str]:
@@ -25,6 +27,16 @@ def tokenize(text: str) -> List[str]:
     return words
 
 
+def word_shingles(tokens: List[str], size: int = 2) -> FrozenSet[str]:
+    """Overlapping runs of `size` words; texts shorter than that are one shingle.
+
+    Unlike a bag of words, shingles change when words are reordered.
+    """
+    if len(tokens) <= size:
+        return frozenset([" ".join(tokens)])
+    return frozenset(" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1))
+
+
 def cosine_similarity_simple(text1: str, text2: str) -> float:
     """Simple cosine similarity using word frequencies."""
     from collections import Counter
@@ -0,0 +1,11 @@
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text: ~4 characters per token."""
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text to roughly `max_tokens`, keeping its beginning."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max(max_chars - 3, 0)] + "..."
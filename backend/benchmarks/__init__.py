@@ -0,0 +1 @@
+"""Load benchmarks for the backend; see `python -m benchmarks --help`."""
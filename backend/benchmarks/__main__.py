@@ -0,0 +1,157 @@
+"""Benchmark the backend against the simulated provider.
+
+Run from the backend directory:
+
+    python -m benchmarks run executor --requests 200 --concurrency 20
+    python -m benchmarks run http --stream --ttft 0.2 --error-rate 0.02
+    python -m benchmarks run websocket --clients 50
+    python -m benchmarks compare executor            # latest two results
+    python -m benchmarks compare old.json new.json
+
+Results are stored under benchmarks/results/, named by scenario and commit.
+To replay recorded production traffic instead of simulating it, run a
+stored pipeline against a recording:
+
+    PROVIDER_MODE=replay RECORDING_PATH=prod.jsonl.gz REPLAY_MATCH=model \
+        python -m benchmarks run executor --pipeline default
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Benchmarks measure the pipeline, not the caches or the history store;
+# set these in the environment to include them
+os.environ.setdefault("HISTORY_BACKEND", "none")
+os.environ.setdefault("RESULT_CACHE_ENABLED", "false")
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "none")
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.split("\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run a scenario and store its result")
+    run.add_argument("scenario", choices=["executor", "http", "websocket"])
+    run.add_argument("--requests", type=int, default=100)
+    run.add_argument("--concurrency", type=int, default=10)
+    run.add_argument("--warmup", type=int, default=10, help="Unmeasured requests first")
+    run.add_argument("--stream", action="store_true", help="Stream tokens (executor, http)")
+    run.add_argument("--clients", type=int, default=10, help="WebSocket clients (websocket)")
+    run.add_argument("--generators", type=int, default=3)
+    run.add_argument("--aggregators", type=int, default=2)
+    run.add_argument("--pipeline", help="Run a stored pipeline instead of the simulated one")
+    run.add_argument("--ttft", type=float, default=0.4, help="Median seconds to first token")
+    run.add_argument("--ttft-sigma", type=float, default=0.3, help="Log-normal TTFT spread")
+    run.add_argument("--tokens-per-second", type=float, default=60.0)
+    run.add_argument("--output-tokens", type=int, default=150)
+    run.add_argument("--output-tokens-stddev", type=float, default=40.0)
+    run.add_argument("--error-rate", type=float, default=0.0)
+    run.add_argument("--chunk-tokens", type=int, default=1)
+    run.add_argument("--seed", type=int, default=None)
+    run.add_argument("--trace-memory", action="store_true", help="Track peak allocations (slow)")
+    run.add_argument("--no-save", action="store_true")
+
+    compare = commands.add_parser("compare", help="Compare two stored results")
+    compare.add_argument("targets", nargs="+", help="A scenario name, or two result files")
+    return parser
+
+
+async def _run(args: argparse.Namespace) -> None:
+    from app.core.pipeline_store import pipeline_store
+    from app.core.workers import consensus_pool
+    from app.providers import provider_registry
+    from app.providers.simulated import SimulationProfile
+    from benchmarks.harness import measure, save_result
+    from benchmarks.scenarios import (
+        ExecutorScenario,
+        HTTPScenario,
+        WebSocketScenario,
+        configure_simulation,
+        simulated_pipeline,
+    )
+
+    profile = SimulationProfile(
+        ttft=args.ttft,
+        ttft_sigma=args.ttft_sigma,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        output_tokens_stddev=args.output_tokens_stddev,
+        error_rate=args.error_rate,
+        chunk_tokens=args.chunk_tokens,
+    )
+    if args.pipeline:
+        pipeline = pipeline_store.get(args.pipeline)
+        if pipeline is None:
+            raise SystemExit(f"Pipeline '{args.pipeline}' not found")
+    else:
+        configure_simulation(profile, args.seed)
+        pipeline = simulated_pipeline(args.generators, args.aggregators)
+
+    if args.scenario == "executor":
+        scenario = ExecutorScenario(pipeline, stream=args.stream)
+    elif args.scenario == "http":
+        scenario = HTTPScenario(pipeline, stream=args.stream, concurrency=args.concurrency)
+    else:
+        scenario = WebSocketScenario(pipeline, concurrency=args.concurrency, clients=args.clients)
+    if args.pipeline:
+        scenario.params["pipeline"] = args.pipeline
+    else:
+        scenario.params["profile"] = vars(profile)
+
+    try:
+        result = await measure(
+            scenario,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            trace_memory=args.trace_memory,
+        )
+    finally:
+        await provider_registry.shutdown()
+        consensus_pool.shutdown()
+
+    print(json.dumps(
+        {
+            "throughput": result.throughput,
+            "errors": result.errors,
+            "latency_ms": result.latency,
+            "loop_lag_ms": result.loop_lag,
+            "memory_mb": result.memory,
+            **result.extra,
+        },
+        indent=2,
+    ))
+    if not args.no_save:
+        print(f"Saved {save_result(result)}", file=sys.stderr)
+
+
+def _compare(targets) -> int:
+    from benchmarks.harness import compare, latest_results, load_result
+
+    if len(targets) == 1:
+        paths = latest_results(targets[0])
+        if len(paths) < 2:
+            print(f"Need two stored '{targets[0]}' results to compare", file=sys.stderr)
+            return 1
+    elif len(targets) == 2:
+        paths = [Path(target) for target in targets]
+    else:
+        print("Give a scenario name or two result files", file=sys.stderr)
+        return 1
+    print(compare(load_result(paths[0]), load_result(paths[1])))
+    return 0
+
+
+def main() -> int:
+    args = _parser().parse_args()
+    if args.command == "compare":
+        return _compare(args.targets)
+    asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
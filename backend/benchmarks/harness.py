@@ -0,0 +1,271 @@
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Metrics where a larger value is an improvement; everything else is a cost
+HIGHER_IS_BETTER = ("throughput",)
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Linearly interpolated percentile of `values`, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def distribution(values: List[float]) -> Dict[str, Optional[float]]:
+    """Summary of a sample in milliseconds."""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) * 1000,
+        "p50": percentile(values, 50) * 1000,
+        "p95": percentile(values, 95) * 1000,
+        "p99": percentile(values, 99) * 1000,
+        "max": max(values) * 1000,
+    }
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag: how late a periodic timer wakes up.
+
+    A loop blocked by CPU work (consensus, JSON encoding, ...) delays every
+    other coroutine by the same amount, so this is the latency the whole
+    process adds on top of the providers.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - expected))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one scenario run, as stored for later comparison."""
+
+    scenario: str
+    params: Dict[str, Any]
+    requests: int
+    errors: int
+    duration: float
+    throughput: float  # Successful requests per second
+    latency: Dict[str, Optional[float]]  # Milliseconds
+    loop_lag: Dict[str, Optional[float]]  # Milliseconds
+    memory: Dict[str, Optional[float]]  # MiB
+    extra: Dict[str, Any] = field(default_factory=dict)
+    commit: Optional[str] = None
+    dirty: bool = False
+    recorded_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    python: str = field(default_factory=lambda: sys.version.split()[0])
+
+
+async def run_load(
+    request: Callable[[int], Awaitable[Any]],
+    requests: int,
+    concurrency: int,
+) -> Tuple[List[float], List[str], float]:
+    """Issue `requests` calls with at most `concurrency` in flight.
+
+    Returns the latencies of successful calls, the errors of failed ones and
+    the wall time of the whole run.
+    """
+    latencies: List[float] = []
+    errors: List[str] = []
+    next_index = iter(range(requests))
+
+    async def worker():
+        for index in next_index:
+            started = time.perf_counter()
+            try:
+                await request(index)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def measure(
+    scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+    trace_memory: bool = False,
+) -> BenchmarkResult:
+    """Run a scenario under load while sampling loop lag and memory."""
+    await scenario.start()
+    try:
+        if warmup:
+            await run_load(scenario.request, warmup, concurrency)
+            scenario.reset()
+
+        rss_before = _rss_mb()
+        if trace_memory:
+            tracemalloc.start()
+        monitor = LoopLagMonitor()
+        monitor.start()
+        try:
+            latencies, errors, duration = await run_load(scenario.request, requests, concurrency)
+        finally:
+            await monitor.stop()
+            traced_peak = None
+            if trace_memory:
+                traced_peak = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+        await scenario.settle()
+        extra = scenario.report()
+    finally:
+        await scenario.stop()
+
+    rss_after = _rss_mb()
+    memory = {
+        "rss_before": rss_before,
+        "rss_after": rss_after,
+        "rss_growth": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        "peak_rss": _peak_rss_mb(),
+        "traced_peak": traced_peak,
+    }
+    commit, dirty = git_revision()
+    return BenchmarkResult(
+        scenario=scenario.name,
+        params={"requests": requests, "concurrency": concurrency, **scenario.params},
+        requests=requests,
+        errors=len(errors),
+        duration=duration,
+        throughput=len(latencies) / duration if duration else 0.0,
+        latency=distribution(latencies),
+        loop_lag=distribution(monitor.samples),
+        memory=memory,
+        extra={**extra, "error_samples": sorted(set(errors))[:5]},
+        commit=commit,
+        dirty=dirty,
+    )
+
+
+def git_revision() -> Tuple[Optional[str], bool]:
+    """Current commit and whether the work tree has uncommitted changes."""
+    cwd = Path(__file__).parent
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd, capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(status.strip())
+
+
+def save_result(result: BenchmarkResult, directory: Path = RESULTS_DIR) -> Path:
+    """Write a result as JSON named by scenario, commit and time."""
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    revision = (result.commit or "nogit") + ("-dirty" if result.dirty else "")
+    path = directory / f"{result.scenario}-{revision}-{stamp}.json"
+    path.write_text(json.dumps(asdict(result), indent=2))
+    return path
+
+
+def load_result(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def latest_results(scenario: str, directory: Path = RESULTS_DIR, count: int = 2) -> List[Path]:
+    """Most recent stored results of a scenario, newest last."""
+    paths = sorted(
+        directory.glob(f"{scenario}-*.json"),
+        key=lambda path: load_result(path)["recorded_at"],
+    )
+    return paths[-count:]
+
+
+def _flatten(result: Dict[str, Any]) -> Dict[str, float]:
+    flat = {"throughput": result["throughput"], "errors": result["errors"]}
+    for group in ("latency", "loop_lag", "memory"):
+        for key, value in result[group].items():
+            if isinstance(value, (int, float)) and key != "count":
+                flat[f"{group}.{key}"] = value
+    for key, value in result.get("extra", {}).items():
+        if isinstance(value, dict):
+            for inner, inner_value in value.items():
+                if isinstance(inner_value, (int, float)) and inner != "count":
+                    flat[f"{key}.{inner}"] = inner_value
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> str:
+    """Table of the metrics two results share, with the relative change."""
+    before, after = _flatten(baseline), _flatten(current)
+    lines = [
+        f"{'metric':<36}{baseline.get('commit') or '?':>14}{current.get('commit') or '?':>14}"
+        f"{'change':>10}",
+    ]
+    for metric in before:
+        if metric not in after:
+            continue
+        old, new = before[metric], after[metric]
+        change = verdict = ""
+        if old:
+            delta = (new - old) / abs(old) * 100
+            change = f"{delta:+.1f}%"
+            if abs(delta) >= 5:
+                improved = delta > 0 if metric in HIGHER_IS_BETTER else delta < 0
+                verdict = "  better" if improved else "  worse"
+        lines.append(f"{metric:<36}{old:>14.2f}{new:>14.2f}{change:>10}{verdict}")
+    if baseline["params"] != current["params"]:
+        lines.append(f"note: parameters differ: {baseline['params']} vs {current['params']}")
+    return "\n".join(lines)
@@ -0,0 +1,329 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import time
+
+import httpx
+import uvicorn
+import websockets
+
+from app.core.events import event_bus
+from app.core.pipeline import PipelineExecutor
+from app.core.pipeline_store import pipeline_store
+from app.models.node import NodeConfig, NodeRole
+from app.models.pipeline import PipelineConfig, PipelineLayer
+from app.providers import provider_registry
+from app.providers.recording import RecordingProvider
+from app.providers.simulated import SimulatedProvider, SimulationProfile, VOCABULARY
+
+from benchmarks.harness import distribution
+
+PIPELINE_ID = "benchmark"
+
+# Node models; each can be given its own profile via SIMULATED_PROFILES
+GENERATOR_MODEL = "sim-generator"
+AGGREGATOR_MODEL = "sim-aggregator"
+FINAL_MODEL = "sim-final"
+
+
+def simulated_pipeline(generators: int = 3, aggregators: int = 2) -> PipelineConfig:
+    """The default pipeline's shape with every node on the simulated provider."""
+    return PipelineConfig(
+        id=PIPELINE_ID,
+        name="Benchmark (simulated)",
+        layers=[
+            PipelineLayer(level=0, nodes=[
+                NodeConfig(id=f"gen-{i}", provider="simulated", model=GENERATOR_MODEL)
+                for i in range(1, generators + 1)
+            ]),
+            PipelineLayer(level=1, nodes=[
+                NodeConfig(
+                    id=f"agg-{i}",
+                    provider="simulated",
+                    model=AGGREGATOR_MODEL,
+                    role=NodeRole.AGGREGATOR,
+                )
+                for i in range(1, aggregators + 1)
+            ]),
+            PipelineLayer(level=2, nodes=[
+                NodeConfig(id="final-1", provider="simulated", model=FINAL_MODEL, role=NodeRole.FINAL),
+            ]),
+        ],
+    )
+
+
+def configure_simulation(profile: SimulationProfile, seed: Optional[int] = None) -> None:
+    """Use `profile` for models without one of their own."""
+    provider = provider_registry.get_instance("simulated")
+    if isinstance(provider, RecordingProvider):
+        provider = provider.provider
+    if not isinstance(provider, SimulatedProvider):
+        # Replaying a recording; there is nothing to simulate
+        return
+    provider.default_profile = profile
+    if seed is not None:
+        provider._random.seed(seed)
+
+
+def question(index: int) -> str:
+    """A distinct question per request so result caches never hit."""
+    words = " ".join(VOCABULARY[(index * 7 + offset) % len(VOCABULARY)] for offset in range(8))
+    return f"Question {index}: which option is better given {words}?"
+
+
+class Scenario(ABC):
+    """A way of issuing one request; `measure()` drives it under load."""
+
+    name = ""
+
+    def __init__(self, pipeline: PipelineConfig, stream: bool = False):
+        self.pipeline = pipeline
+        self.stream = stream
+        self.params: Dict[str, Any] = {
+            "stream": stream,
+            "nodes": sum(len(layer.nodes) for layer in pipeline.layers),
+        }
+        self.first_token: List[float] = []
+        self._bus_baseline: Dict[str, int] = {}
+
+    async def start(self) -> None:
+        pass
+
+    async def settle(self) -> None:
+        """Wait for work the requests left behind (e.g. undelivered events)."""
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def request(self, index: int) -> None:
+        """Issue request number `index` and wait for it to finish."""
+        pass
+
+    def reset(self) -> None:
+        """Forget measurements taken during warm-up."""
+        self.first_token = []
+        self._bus_baseline = event_bus.stats()
+
+    def report(self) -> Dict[str, Any]:
+        """Scenario-specific measurements (milliseconds) for the result."""
+        report: Dict[str, Any] = {
+            # Event counts of the measured requests only
+            "event_bus": {
+                key: value - self._bus_baseline.get(key, 0)
+                for key, value in event_bus.stats().items()
+                if key in ("published", "delivered", "coalesced", "dropped")
+            },
+        }
+        if self.stream:
+            report["first_token"] = distribution(self.first_token)
+        return report
+
+
+class ExecutorScenario(Scenario):
+    """Runs `PipelineExecutor` directly, with events going to a counting sink."""
+
+    name = "executor"
+
+    def __init__(self, pipeline: PipelineConfig, stream: bool = False):
+        super().__init__(pipeline, stream)
+        self.events = 0
+
+    async def _deliver(self, event: dict) -> None:
+        self.events += 1
+
+    async def start(self) -> None:
+        event_bus.start(self._deliver)
+
+    async def stop(self) -> None:
+        await event_bus.stop()
+
+    async def request(self, index: int) -> None:
+        executor = PipelineExecutor(self.pipeline, stream=self.stream)
+        if self.stream:
+            started = time.perf_counter()
+            first_token = None
+            async for _ in executor.execute_stream(question(index)):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+            if first_token is not None:
+                self.first_token.append(first_token)
+        else:
+            await executor.execute(question(index))
+        if executor.state.status != "completed":
+            raise RuntimeError(f"Execution finished with status '{executor.state.status}'")
+
+    def reset(self) -> None:
+        super().reset()
+        self.events = 0
+
+    def report(self) -> Dict[str, Any]:
+        return {**super().report(), "events_delivered": self.events}
+
+
+class AppServer:
+    """The FastAPI app served by uvicorn on a free local port, in this process."""
+
+    def __init__(self):
+        from app.main import app
+
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="on")
+        )
+        self._task: Optional[asyncio.Task] = None
+        self.port: Optional[int] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            if self._task.done():
+                # Surface the startup error
+                await self._task
+            await asyncio.sleep(0.01)
+        self.port = self.server.servers[0].sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.should_exit = True
+        if self._task is not None:
+            await self._task
+
+
+class HTTPScenario(Scenario):
+    """Posts to /api/chat/ on a live server, as JSON or as server-sent events."""
+
+    name = "http"
+
+    def __init__(self, pipeline: PipelineConfig, stream: bool = False, concurrency: int = 10):
+        super().__init__(pipeline, stream)
+        self.concurrency = concurrency
+        self.server = AppServer()
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        pipeline_store.save(self.pipeline)
+        await self.server.start()
+        self.client = httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{self.server.port}",
+            limits=httpx.Limits(max_connections=self.concurrency),
+            timeout=None,
+        )
+
+    async def stop(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+        await self.server.stop()
+
+    async def request(self, index: int) -> Optional[str]:
+        payload = {"message": question(index), "pipeline_id": self.pipeline.id, "stream": self.stream}
+        if not self.stream:
+            response = await self.client.post("/api/chat/", json=payload)
+            response.raise_for_status()
+            return response.json()["pipeline_execution_id"]
+
+        started = time.perf_counter()
+        first_token = None
+        event = None
+        async with self.client.stream("POST", "/api/chat/", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    if event == "delta" and first_token is None:
+                        first_token = time.perf_counter() - started
+                    elif event == "error":
+                        raise RuntimeError(json.loads(line[len("data:"):])["detail"])
+        if first_token is not None:
+            self.first_token.append(first_token)
+        return None
+
+
+class WebSocketScenario(HTTPScenario):
+    """HTTP requests while WebSocket clients receive every pipeline event.
+
+    Reports how long after a request started each client learned that its
+    execution completed, and how many events the clients received.
+    """
+
+    name = "websocket"
+
+    def __init__(self, pipeline: PipelineConfig, concurrency: int = 10, clients: int = 10):
+        super().__init__(pipeline, stream=False, concurrency=concurrency)
+        self.params["clients"] = clients
+        self.clients = clients
+        self._readers: List[asyncio.Task] = []
+        self._sockets: list = []
+        self.events = 0
+        self._started: Dict[str, float] = {}
+        self._completed: Dict[str, List[float]] = {}
+
+    async def start(self) -> None:
+        await super().start()
+        for _ in range(self.clients):
+            socket = await websockets.connect(
+                f"ws://127.0.0.1:{self.server.port}/ws/pipeline", max_queue=None
+            )
+            self._sockets.append(socket)
+            self._readers.append(asyncio.create_task(self._read(socket)))
+
+    async def stop(self) -> None:
+        for reader in self._readers:
+            reader.cancel()
+        await asyncio.gather(*self._readers, return_exceptions=True)
+        for socket in self._sockets:
+            await socket.close()
+        await super().stop()
+
+    async def _read(self, socket) -> None:
+        async for raw in socket:
+            received = time.perf_counter()
+            self.events += 1
+            message = json.loads(raw)
+            if message.get("event") == "pipeline_update" and message.get("status") == "completed":
+                self._completed.setdefault(message["execution_id"], []).append(received)
+
+    async def request(self, index: int) -> None:
+        started = time.perf_counter()
+        execution_id = await super().request(index)
+        self._started[execution_id] = started
+
+    async def settle(self, timeout: float = 10.0) -> None:
+        """Give the clients time to receive the last completions."""
+        expected = len(self._started) * self.clients
+        waited_until = time.perf_counter() + timeout
+        while time.perf_counter() < waited_until:
+            received = sum(len(self._completed.get(execution_id, [])) for execution_id in self._started)
+            if received >= expected:
+                return
+            await asyncio.sleep(0.05)
+
+    def reset(self) -> None:
+        super().reset()
+        self.events = 0
+        self._started.clear()
+        self._completed.clear()
+
+    def report(self) -> Dict[str, Any]:
+        from app.api.websocket import manager
+
+        notified = [
+            received - started
+            for execution_id, started in self._started.items()
+            for received in self._completed.get(execution_id, [])
+        ]
+        return {
+            **super().report(),
+            "completion_notify": distribution(notified),
+            "events_received": self.events,
+            "missed_completions": len(self._started) * self.clients - len(notified),
+            "dropped_messages": manager.stats()["dropped_messages"],
+        }
+
+
+SCENARIOS = {
+    ExecutorScenario.name: ExecutorScenario,
+    HTTPScenario.name: HTTPScenario,
+    WebSocketScenario.name: WebSocketScenario,
+}
@@ -0,0 +1,64 @@
+import asyncio
+
+from app.core.events import EventBus
+
+
+def _delta(node_id, text):
+    return {"event": "node_delta", "execution_id": "e1", "node_id": node_id, "delta": text}
+
+
+def _collect(publish):
+    """Publish a burst while the dispatcher is busy, return what it delivers."""
+
+    async def run():
+        bus = EventBus()
+        delivered = []
+
+        async def deliver(event):
+            delivered.append(event)
+
+        bus.start(deliver)
+        publish(bus)
+        await bus.stop()
+        return bus, delivered
+
+    return asyncio.run(run())
+
+
+def test_interleaved_deltas_coalesce_per_node():
+    def publish(bus):
+        for i in range(5):
+            bus.publish(_delta("g1", f"a{i}"))
+            bus.publish(_delta("g2", f"b{i}"))
+
+    bus, delivered = _collect(publish)
+
+    assert bus.coalesced == 8
+    assert [(e["node_id"], e["delta"]) for e in delivered] == [
+        ("g1", "a0a1a2a3a4"),
+        ("g2", "b0b1b2b3b4"),
+    ]
+
+
+def test_other_events_keep_their_place():
+    def publish(bus):
+        bus.publish({"event": "pipeline_update", "execution_id": "e1", "status": "running"})
+        bus.publish(_delta("g1", "a0"))
+        bus.publish(_delta("g2", "b0"))
+        bus.publish(_delta("g1", "a1"))
+        bus.publish({"event": "node_update", "execution_id": "e1", "node_id": "g1", "status": "completed"})
+        bus.publish(_delta("g2", "b1"))
+        bus.publish(_delta("g1", "late"))
+        bus.publish({"event": "pipeline_update", "execution_id": "e1", "status": "completed"})
+
+    bus, delivered = _collect(publish)
+
+    assert bus.coalesced == 2
+    assert [(e["event"], e.get("node_id"), e.get("delta") or e.get("status")) for e in delivered] == [
+        ("pipeline_update", None, "running"),
+        ("node_delta", "g1", "a0a1"),
+        ("node_delta", "g2", "b0b1"),
+        ("node_update", "g1", "completed"),
+        ("node_delta", "g1", "late"),
+        ("pipeline_update", None, "completed"),
+    ]
@@ -8,7 +8,9 @@ import { api } from '../lib/api';
 export function useChat() {
   const { messages, isLoading, addMessage, setLoading } = useChatStore();
   const { currentPipeline, startExecution, finishExecution } = usePipelineStore();
-  const { subscribe } = useWebSocket();
+  // Live node updates arrive over the socket for every execution; the chat
+  // response only returns once the run is over, too late to subscribe to it
+  useWebSocket();
 
   const sendMessage = useCallback(
     async (content: string) => {
@@ -30,9 +32,6 @@ export function useChat() {
           pipelineId: currentPipeline?.id,
         });
 
-        // Subscribe to WebSocket updates for this execution
-        subscribe(response.pipelineExecutionId);
-
         // Start execution in store
         if (currentPipeline) {
           startExecution(response.pipelineExecutionId, currentPipeline.id);
@@ -78,7 +77,6 @@ export function useChat() {
       setLoading,
       startExecution,
       finishExecution,
-      subscribe,
     ]
   );
 